@@ -0,0 +1,152 @@
+# Shared image cache for the pygame front-end.
+# Every PNG under images/ is decoded and scaled to card size once, packed into a
+# single atlas surface, and handed out as subsurfaces, so cards share pixels
+# instead of owning copies and new rounds never touch the disk. The damage
+# flash is precomputed as a second atlas row.
+#
+# load_background() does the decoding on a worker thread, in the order the
+# caller asks for (e.g. the cards in hand first), so the first frame doesn't
+# wait for it. poll() swaps finished images into the atlas from the main
+# thread; until then image() returns None and cards use their fallback look.
+#
+# The decoded sources are kept, so when the window changes size resize()
+# rescales each image from its source once for the new card size. Atlases of
+# the last few sizes are kept too, so going back to one (e.g. leaving
+# fullscreen) rescales nothing.
+
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+import pygame
+
+FLASH_TINT = (255,255,0,100)
+MAX_SIZES = 3  # card sizes with an atlas kept, the current one included
+
+class AssetManager:
+    def __init__(self, image_dir, size):
+        self.image_dir = image_dir
+        self.size = size
+        self.names = sorted(n for n in os.listdir(image_dir) if n.lower().endswith(".png"))
+        self.slots = {name: i for i, name in enumerate(self.names)}  # atlas column
+        self.atlas = None
+        self.tint = None
+        self.images = {}   # file name -> subsurface of the atlas
+        self.flashed = {}  # file name -> tinted subsurface
+        self.sources = {}  # file name -> decoded image at its own size
+        self.sizes = OrderedDict()  # earlier card size -> (atlas, tint, images, flashed)
+        self.disk_loads = 0
+        self.rescales = 0
+        self.decoded = queue.Queue()
+        self.pending = 0  # images and jobs not swapped in / finished yet
+        self.started = 0.0
+        self.load_time = None  # seconds from load_background() to the last image
+
+    def load_all(self):
+        # Decode everything now, on this thread
+        self._make_atlas()
+        for name in self.names:
+            source = self._decode(name)
+            if source:
+                self.sources[name] = source
+                self._add(name, pygame.transform.scale(source, self.size))
+
+    def load_background(self, first=(), jobs=()):
+        # Decode on a worker thread: names in first, then the other images, then
+        # jobs (callables, e.g. loading music). poll() picks the results up.
+        self._make_atlas()
+        order = [n for n in dict.fromkeys(first) if n in self.slots]
+        order += [n for n in self.names if n not in order]
+        self.pending = len(order) + len(jobs)
+        self.started = time.perf_counter()
+        threading.Thread(target=self._worker, args=(order, jobs), name="assets", daemon=True).start()
+
+    def _worker(self, order, jobs):
+        for name in order:
+            source = self._decode(name)
+            # Scaled to the size of the moment; poll() redoes it after a resize
+            image = pygame.transform.scale(source, self.size) if source else None
+            self.decoded.put((name, source, image))
+        for job in jobs:
+            try:
+                job()
+            except Exception as e:
+                print(f"Error in asset job {job.__name__}: {e}")
+            self.decoded.put((None, None, None))
+
+    def _decode(self, name):
+        # File read and decode only: safe off the main thread
+        try:
+            image = pygame.image.load(os.path.join(self.image_dir, name))
+            self.disk_loads += 1
+            return image
+        except Exception as e:
+            print(f"Error loading image {name}: {e}")
+            return None
+
+    def poll(self):
+        # Swap decoded images into the atlas; True if anything changed
+        changed = False
+        while True:
+            try:
+                name, source, image = self.decoded.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if source:
+                self.sources[name] = source
+                if image.get_size() != self.size:
+                    image = pygame.transform.scale(source, self.size)
+                self._add(name, image)
+                changed = True
+        if not self.pending and self.load_time is None and self.started:
+            self.load_time = time.perf_counter() - self.started
+        return changed
+
+    def loading(self):
+        return self.pending > 0
+
+    def resize(self, size):
+        # Switch to cards of another size, from a kept atlas or by rescaling
+        # every decoded source once
+        if size == self.size:
+            return
+        if self.atlas is not None:
+            self.sizes[self.size] = (self.atlas, self.tint, self.images, self.flashed)
+        self.size = size
+        if size in self.sizes:
+            self.atlas, self.tint, self.images, self.flashed = self.sizes.pop(size)
+        else:
+            self._make_atlas()
+            self.images = {}
+            self.flashed = {}
+        while len(self.sizes) >= MAX_SIZES:
+            self.sizes.popitem(last=False)  # least recently used
+        for name, source in self.sources.items():
+            if name not in self.images:
+                self._add(name, pygame.transform.scale(source, size))
+                self.rescales += 1
+
+    def _make_atlas(self):
+        # Row 0 holds the plain images, row 1 the flash variants
+        w, h = self.size
+        self.atlas = pygame.Surface((max(1, len(self.names))*w, 2*h), pygame.SRCALPHA).convert_alpha()
+        self.tint = pygame.Surface(self.size, pygame.SRCALPHA)
+        self.tint.fill(FLASH_TINT)
+
+    def _add(self, name, image):
+        w, h = self.size
+        x = self.slots[name] * w
+        image = image.convert_alpha()
+        self.atlas.blit(image, (x, 0))
+        self.atlas.blit(image, (x, h))
+        self.atlas.blit(self.tint, (x, h))
+        self.images[name] = self.atlas.subsurface((x, 0, w, h))
+        self.flashed[name] = self.atlas.subsurface((x, h, w, h))
+
+    def image(self, name, flashing=False):
+        if not name:
+            return None
+        return (self.flashed if flashing else self.images).get(name)
@@ -0,0 +1,306 @@
+# Music and sound effects for the pygame front-end.
+#
+# Music plays from whole decoded Sounds on two reserved mixer channels, so the
+# battle and shop moods can crossfade: the old channel fades out while the
+# other fades in, both ramped by SDL's mixer thread. Each mood has a playlist,
+# and the track after the current one is queued on its channel so it follows
+# without a gap. Tracks are decoded on a worker thread, the one needed next
+# first; only the current and next track of each mood are kept in memory. The
+# worker hands finished Sounds back through a queue that update() drains, so
+# only the main thread ever touches the manager's state.
+#
+# Sound effects (a hit, a defeat) are read or synthesized once on the same
+# thread and play on a small pool of reserved channels; when all of them are
+# busy the oldest sound is cut. Nothing on the main thread waits for the disk
+# or the decoder: a track that isn't ready yet starts once it is.
+#
+# Tracks come from music/battle/ and music/shop/ (ogg, mp3 or wav, in name
+# order); a mood with none plays music.mp3, and if both moods end up on the
+# same track it just keeps playing. sfx/hit.wav and sfx/defeat.wav replace the
+# synthesized effects.
+#
+#   python audio.py --check     dummy audio driver: crossfades, playlist, pool, main-thread cost
+
+import argparse
+import math
+import os
+import queue
+import random
+import threading
+import time
+from array import array
+
+import pygame
+
+MOODS = ("battle", "shop")
+EFFECTS = ("hit", "defeat")
+TRACK_TYPES = (".ogg", ".mp3", ".wav")
+MUSIC_VOLUME = 0.5
+EFFECT_VOLUME = 0.6
+CROSSFADE_MS = 1200
+EFFECT_CHANNELS = 4
+
+# Mixer sample sizes (as pygame.mixer.get_init reports them) and their array typecodes
+SAMPLE_TYPES = {8: "B", -8: "b", 16: "H", -16: "h", 32: "f"}
+
+class AudioManager:
+    def __init__(self, base_dir, fallback):
+        self.base_dir = base_dir
+        self.playlists = {mood: self._tracks(mood) or [fallback] for mood in MOODS}
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), 2 + EFFECT_CHANNELS))
+        pygame.mixer.set_reserved(2 + EFFECT_CHANNELS)
+        self.music = [pygame.mixer.Channel(0), pygame.mixer.Channel(1)]
+        self.pool = [pygame.mixer.Channel(2 + i) for i in range(EFFECT_CHANNELS)]
+        self.next_channel = 0
+        self.active = 0  # music channel of the current mood
+        self.mood = None
+        self.position = dict.fromkeys(MOODS, 0)  # playlist index of each mood's current track
+        self.playing = None  # path on the active channel
+        self.queued = None  # path queued behind it
+        self.decoded = {}  # path -> Sound, or None if it couldn't be read
+        self.effects = {}  # name -> Sound
+        self.requested = set()
+        self.effects_played = 0
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()  # (decoded or effects, key, Sound) from the worker
+        self.thread = threading.Thread(target=self._run, name="audio", daemon=True)
+        self.thread.start()
+        self.jobs.put(("effects", None))
+
+    def _tracks(self, mood):
+        folder = os.path.join(self.base_dir, "music", mood)
+        if not os.path.isdir(folder):
+            return []
+        return [os.path.join(folder, n) for n in sorted(os.listdir(folder)) if n.lower().endswith(TRACK_TYPES)]
+
+    # --- Music ---
+    def set_mood(self, mood):
+        # Crossfade to mood's current track (at once if decoded, else when it is)
+        if mood == self.mood:
+            return
+        previous, self.mood = self.mood, mood
+        if previous and self._track(mood) == self.playing and self.queued is None:
+            return  # the same track serves both moods
+        self.music[self.active].fadeout(CROSSFADE_MS)
+        self.active ^= 1
+        self.music[self.active].stop()  # still fading out from an earlier switch
+        self.playing = self.queued = None
+        self.update()
+
+    def update(self):
+        # Once per loop: start the mood's track when it's decoded, follow the
+        # playlist and keep the next track queued. Never waits.
+        self._collect()
+        if self.mood is None:
+            return
+        channel = self.music[self.active]
+        playlist = self.playlists[self.mood]
+        if self.queued and channel.get_queue() is None and channel.get_busy():
+            # The queued track has started
+            self.position[self.mood] = playlist.index(self.queued)
+            self.playing, self.queued = self.queued, None
+        elif self.playing and not channel.get_busy():
+            # Ran out before the next track was ready
+            self.position[self.mood] = (self.position[self.mood] + 1) % len(playlist)
+            self.playing = self.queued = None
+        if self.playing is None:
+            path = self._track(self.mood)
+            sound = self._sound(path)
+            if sound:
+                channel.set_volume(MUSIC_VOLUME)
+                channel.play(sound, loops=-1 if len(playlist) == 1 else 0, fade_ms=CROSSFADE_MS)
+                self.playing = path
+        elif self.queued is None and len(playlist) > 1:
+            path = playlist[(self.position[self.mood] + 1) % len(playlist)]
+            sound = self._sound(path)
+            if sound:
+                channel.queue(sound)
+                self.queued = path
+        self._forget()
+
+    def _collect(self):
+        # Take in whatever the worker has finished
+        while True:
+            try:
+                store, key, sound = self.results.get_nowait()
+            except queue.Empty:
+                return
+            store[key] = sound
+
+    def waiting(self):
+        # A mood is set but its track is still being decoded
+        return self.mood is not None and self.playing is None and self._track(self.mood) not in self.decoded
+
+    def _track(self, mood):
+        return self.playlists[mood][self.position[mood]]
+
+    def _sound(self, path):
+        if path not in self.requested:
+            self.requested.add(path)
+            self.jobs.put(("track", path))
+        return self.decoded.get(path)
+
+    def _forget(self):
+        # Drop decoded tracks that aren't current or next for any mood
+        keep = {self.playing, self.queued}
+        for mood, playlist in self.playlists.items():
+            i = self.position[mood]
+            keep.update((playlist[i], playlist[(i + 1) % len(playlist)]))
+        for path in [p for p in self.decoded if p not in keep]:
+            del self.decoded[path]
+            self.requested.discard(path)
+
+    # --- Effects ---
+    def play_effect(self, name):
+        sound = self.effects.get(name)
+        if sound is None:
+            return
+        n = len(self.pool)
+        for k in range(n):
+            i = (self.next_channel + k) % n
+            if not self.pool[i].get_busy():
+                break
+        else:
+            i = self.next_channel  # the one started longest ago
+        self.pool[i].play(sound)
+        self.next_channel = (i + 1) % n
+        self.effects_played += 1
+
+    def attach(self, game):
+        # Follow the live game (only this object, like profiler.instrument):
+        # moods on start_shop/start_next_round, a hit and a defeat sound per exchange
+        def wrap(name, after):
+            method = getattr(game, name)
+            def wrapped(*args):
+                result = method(*args)
+                after()
+                return result
+            setattr(game, name, wrapped)
+        wrap("start_shop", lambda: self.set_mood("shop"))
+        wrap("start_next_round", lambda: self.set_mood("battle"))
+
+        exchange = game.exchange
+        def exchanged():
+            player = game.player
+            before = (player.hp, sum(c.hp for c in player.in_play), len(player.graveyard),
+                      sum(c.hp for c in game.enemy.in_play), len(game.enemy.in_play))
+            exchange()
+            after = (player.hp, sum(c.hp for c in player.in_play), len(player.graveyard),
+                     sum(c.hp for c in game.enemy.in_play), len(game.enemy.in_play))
+            if after != before:
+                self.play_effect("hit")
+            if after[2] > before[2] or after[4] < before[4]:
+                self.play_effect("defeat")
+        game.exchange = exchanged
+        self.set_mood("shop" if game.in_shop else "battle")
+
+    # --- Worker thread ---
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            kind, path = job
+            if kind == "effects":
+                for name in EFFECTS:
+                    self.results.put((self.effects, name, self._load_effect(name)))
+                continue
+            try:
+                sound = pygame.mixer.Sound(path)
+            except (pygame.error, OSError) as e:
+                print(f"Could not load music {path}: {e}")
+                sound = None
+            self.results.put((self.decoded, path, sound))
+
+    def _load_effect(self, name):
+        path = os.path.join(self.base_dir, "sfx", f"{name}.wav")
+        try:
+            sound = pygame.mixer.Sound(path) if os.path.exists(path) else synthesize(name)
+        except (pygame.error, OSError) as e:
+            print(f"Could not load sound effect {path}: {e}")
+            sound = synthesize(name)
+        sound.set_volume(EFFECT_VOLUME)
+        return sound
+
+    def close(self):
+        self.jobs.put(None)
+        self.thread.join()
+
+# --- Synthesized effects ---
+def synthesize(name):
+    # A short noise burst for a hit, a falling tone for a defeat, in the mixer's format
+    frequency, size, channels = pygame.mixer.get_init()
+    if name == "hit":
+        rng = random.Random(0)
+        times = [i / frequency for i in range(int(frequency * 0.08))]
+        wave = [rng.uniform(-1, 1) * math.exp(-t * 40) for t in times]
+    else:
+        times = [i / frequency for i in range(int(frequency * 0.3))]
+        wave = [math.copysign(0.5, math.sin(2 * math.pi * (440 - 600 * t) * t)) * math.exp(-t * 8) for t in times]
+    if size == 32:
+        samples = wave
+    else:
+        peak = (1 << (abs(size) - 1)) - 1
+        offset = 0 if size < 0 else peak + 1  # unsigned samples sit around the midpoint
+        samples = [int(v * peak * 0.8) + offset for v in wave]
+    # Every sample once per output channel, interleaved
+    data = array(SAMPLE_TYPES[size], (s for s in samples for _ in range(channels)))
+    return pygame.mixer.Sound(buffer=data.tobytes())
+
+# --- Self-check ---
+def check(base_dir):
+    # Every main-thread call is timed; the decoder runs meanwhile
+    pygame.mixer.init()
+    calls = []
+    def timed(f, *args):
+        start = time.perf_counter()
+        result = f(*args)
+        calls.append(time.perf_counter() - start)
+        return result
+    def wait_for(condition, seconds=5.0):
+        deadline = time.perf_counter() + seconds
+        while not condition() and time.perf_counter() < deadline:
+            timed(audio.update)
+            time.sleep(0.002)
+        return condition()
+
+    audio = timed(AudioManager, base_dir, os.path.join(base_dir, "music.mp3"))
+    timed(audio.set_mood, "battle")
+    started = wait_for(lambda: audio.playing is not None)
+    print(f"battle music playing: {started}, on channel {audio.active}")
+
+    # A two-track shop playlist of short synthesized tracks, to see it follow on
+    short = [synthesize("defeat"), synthesize("hit")]
+    audio.playlists["shop"] = ["short-0", "short-1"]
+    audio.decoded.update({"short-0": short[0], "short-1": short[1]})
+    audio.requested.update(audio.decoded)
+    timed(audio.set_mood, "shop")
+    old = audio.music[audio.active ^ 1]
+    print(f"shop: crossfading, old channel fading {old.get_busy()}, new one playing {audio.music[audio.active].get_busy()}")
+    followed = wait_for(lambda: audio.position["shop"] == 1, 2.0)
+    print(f"shop playlist moved on to its second track: {followed}")
+    timed(audio.set_mood, "battle")
+    back = wait_for(lambda: audio.playing is not None)
+    print(f"back to battle music: {back}")
+
+    wait_for(lambda: len(audio.effects) == len(EFFECTS))
+    for _ in range(10):
+        timed(audio.play_effect, "hit")
+    busy = sum(c.get_busy() for c in audio.pool)
+    print(f"10 hits at once: {busy} of {len(audio.pool)} pool channels busy, music channels untouched: "
+          f"{audio.music[audio.active].get_busy()}")
+    timed(audio.close)
+    worst = max(calls) * 1000
+    print(f"{len(calls)} main-thread calls, worst {worst:.2f} ms, mean {sum(calls) / len(calls) * 1000:.3f} ms")
+    return started and followed and back and busy == len(audio.pool) and worst < 5
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audio manager self-check")
+    parser.add_argument("--check", action="store_true", help="run against SDL's dummy audio driver")
+    args = parser.parse_args()
+    if args.check:
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        ok = check(os.path.dirname(os.path.abspath(__file__)))
+        print("audio check", "OK" if ok else "FAILED")
+        raise SystemExit(0 if ok else 1)
+    parser.print_help()
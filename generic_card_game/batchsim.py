@@ -0,0 +1,327 @@
+# Vectorized simulator: runs N games of the engine rules in lockstep with NumPy.
+# Every game gets one policy step per BatchSim.step(), using the same greedy
+# policy as engine.run_game, so results can be cross-checked game by game.
+# Cards and enemies come from the rules' catalog, like the engine's, and a game
+# that clears the rules' win_rounds ends there, won.
+#
+# Randomness comes from a counter-based stream (SplitMix64 of game key + draw
+# index) instead of a shared generator. The batch side draws whole vectors of it
+# and StreamRNG replays the exact same numbers for a single scalar Game.
+#
+#   python batchsim.py --games 10000 --max-rounds 50
+#   python batchsim.py --check --games 2000
+#   python batchsim.py --check --catalog catalogs/roguelike.json
+
+import argparse
+import random
+import time
+from itertools import chain
+
+import numpy as np
+
+from catalog import load_source
+from engine import DEAD, DECK, DEFAULT_RULES, HAND, IN_PLAY, START_HAND_SIZE, catalog_rules, greedy_policy, run_game
+
+BIG = np.int64(1) << 62
+MASK64 = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+
+# --- Counter-based random stream ---
+def _mix(z):
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+def _mix_np(z):
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def stream_keys(seed, n_games):
+    base = np.uint64(_mix((seed * GOLDEN) & MASK64))
+    return _mix_np(base + np.arange(n_games, dtype=np.uint64))
+
+def stream_key(seed, game_index):
+    return _mix((_mix((seed * GOLDEN) & MASK64) + game_index) & MASK64)
+
+def uniform_np(keys, counters):
+    z = _mix_np(keys + (counters + np.uint64(1)) * np.uint64(GOLDEN))
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0**-53
+
+class StreamRNG:
+    # Drop-in for random.Random in engine.Game, replaying one game's stream
+    def __init__(self, seed, game_index):
+        self.key = stream_key(seed, game_index)
+        self.counter = 0
+
+    def random(self):
+        self.counter += 1
+        z = _mix((self.key + self.counter * GOLDEN) & MASK64)
+        return (z >> 11) * 2.0**-53
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    def shuffle(self, x):
+        for i in reversed(range(1, len(x))):
+            j = int(self.random() * (i + 1))
+            x[i], x[j] = x[j], x[i]
+
+# --- Batched game state ---
+class BatchSim:
+    def __init__(self, n_games, seed=0, max_rounds=100, buy_order=("atk",), rules=DEFAULT_RULES):
+        n = self.n = n_games
+        self.max_rounds = max_rounds
+        self.buy_order = buy_order
+        self.rules = rules
+        self.keys = stream_keys(seed, n)
+        self.draws = np.zeros(n, np.uint64)
+
+        catalog = rules.catalog
+        self.deck_size = d = len(catalog.starting_deck)
+        idx = np.arange(d, dtype=np.int64)
+        self.names = [name for name, _, _, _ in catalog.starting_deck]
+        self.hp = np.tile(np.array([hp for _, hp, _, _ in catalog.starting_deck], np.int64), (n, 1))
+        self.atk = np.tile(np.array([atk for _, _, atk, _ in catalog.starting_deck], np.int64), (n, 1))
+        self.zone = np.full((n, d), DECK, np.int8)
+        self.zone[:, :START_HAND_SIZE] = HAND
+        # Position in the engine's deck/hand lists; zone tells which list
+        self.order = np.tile(idx, (n, 1))
+        self.seq = np.full(n, d, np.int64)
+
+        self.php = np.full(n, rules.player_hp, np.int64)
+        self.coins = np.zeros(n, np.int64)
+        self.extra_draw = np.zeros(n, np.int64)
+        self.pending = np.zeros(n, np.int64)  # coins owed for enemies killed this round
+        self.rounds = np.zeros(n, np.int64)
+        self.over = np.zeros(n, bool)
+        self.won = np.zeros(n, bool)
+        self.in_shop = np.zeros(n, bool)
+        # Coins held on entering the shop, summed over games, per round
+        self.shop_coins = np.zeros(max_rounds + 1, np.int64)
+        self.shop_visits = np.zeros(max_rounds + 1, np.int64)
+
+        # Enemy stats per round (row), as catalog.enemies_for hands them out
+        rows = [catalog.enemies_for(r) for r in range(max_rounds + 1)]
+        self.round_hp = np.array([[hp for _, hp, _, _ in row] for row in rows], np.int64)
+        self.round_atk = np.array([[atk for _, _, atk, _ in row] for row in rows], np.int64)
+        self.n_enemies = len(catalog.enemy_names)
+        self.ehp = np.tile(self.round_hp[0], (n, 1))
+        self.eatk = np.tile(self.round_atk[0], (n, 1))
+        self.alive = np.ones((n, self.n_enemies), bool)
+
+    def _uniform(self, mask):
+        g = np.nonzero(mask)[0]
+        u = uniform_np(self.keys[g], self.draws[g])
+        self.draws[g] += np.uint64(1)
+        return g, u
+
+    def run(self):
+        while self.step():
+            pass
+        return self
+
+    def step(self):
+        active = ~self.over & ~self.won & (self.rounds < self.max_rounds)
+        if not active.any():
+            return False
+        shop = active & self.in_shop
+        battle = active & ~self.in_shop
+        if shop.any():
+            self._shop(shop)
+        if battle.any():
+            self._battle(battle)
+        return True
+
+    # --- Battle ---
+    def _battle(self, battle):
+        zone, order = self.zone, self.order
+        is_hand = zone == HAND
+        has_hand = is_hand.any(1)
+        has_deck = (zone == DECK).any(1)
+        self.over |= battle & ~has_hand & ~has_deck
+
+        # Policy: play the first card in hand, draw otherwise
+        play = battle & has_hand
+        g = np.nonzero(play)[0]
+        c = np.argmin(np.where(is_hand, order, BIG), 1)[g]
+        zone[g, c] = IN_PLAY
+
+        draw = battle & ~has_hand & has_deck
+        self._pop_deck(draw)
+
+        acting = play | draw
+        self._enemy_turn(acting)
+        self._player_attack(acting)
+
+        dead = acting & (self.php <= 0)
+        self.over |= dead
+        clear = acting & ~dead & ~self.alive.any(1)
+        if self.rules.win_rounds:
+            won = clear & (self.rounds + 1 >= self.rules.win_rounds)
+            self.won |= won
+            clear &= ~won
+        self.in_shop |= clear
+        self.coins[clear] += self.pending[clear]
+        self.pending[clear] = 0
+        np.add.at(self.shop_coins, self.rounds[clear], self.coins[clear])
+        np.add.at(self.shop_visits, self.rounds[clear], 1)
+
+    def _pop_deck(self, mask):
+        g = np.nonzero(mask)[0]
+        c = np.argmin(np.where(self.zone == DECK, self.order, BIG), 1)[g]
+        self.zone[g, c] = HAND
+        self.order[g, c] = self.seq[g]
+        self.seq[g] += 1
+
+    def _in_play_sorted(self, g):
+        # In-play card indices per game in hand-list order, plus how many there are
+        inplay = self.zone[g] == IN_PLAY
+        return np.argsort(np.where(inplay, self.order[g], BIG), 1, kind="stable"), inplay.sum(1)
+
+    def _enemy_turn(self, acting):
+        for e in range(self.n_enemies):
+            m = acting & self.alive[:, e]
+            count = (self.zone == IN_PLAY).sum(1)
+            face = m & (count == 0)
+            self.php[face] -= self.eatk[face, e]
+            g, u = self._uniform(m & (count > 0))
+            if not len(g):
+                continue
+            sorted_idx, count = self._in_play_sorted(g)
+            k = (u * count).astype(np.int64)
+            c = sorted_idx[np.arange(len(g)), k]
+            self.hp[g, c] -= self.eatk[g, e]
+            dead = self.hp[g, c] <= 0
+            self.zone[g[dead], c[dead]] = DEAD
+
+    def _player_attack(self, acting):
+        g_all = np.nonzero(acting)[0]
+        sorted_idx, count = self._in_play_sorted(g_all)
+        for j in range(int(count.max(initial=0))):
+            m = (count > j) & self.alive[g_all].any(1)
+            g = g_all[m]
+            c = sorted_idx[m, j]
+            t = np.argmax(self.alive[g], 1)
+            self.ehp[g, t] -= self.atk[g, c]
+            dead = self.ehp[g, t] <= 0
+            self.alive[g[dead], t[dead]] = False
+            self.pending[g[dead]] += np.maximum(1, self.eatk[g[dead], t[dead]])
+
+    # --- Shop and next round ---
+    def _shop(self, shop):
+        prices = self.rules.shop_prices
+        selected = {stat: np.zeros(self.n, np.int64) for stat in prices}
+        while True:
+            bought = np.zeros(self.n, bool)
+            for stat in self.buy_order:
+                can = shop & (self.coins >= prices[stat])
+                selected[stat] += can
+                self.coins -= prices[stat] * can
+                bought |= can
+            if not bought.any():
+                break
+
+        # apply_shop
+        self.extra_draw += selected["draw"]
+        live = (self.zone != DEAD) & shop[:, None]
+        self.atk += selected["atk"][:, None] * live
+        self.hp += selected["hp"][:, None] * live
+        self.in_shop[shop] = False
+
+        # start_next_round: hand and in-play cards go to the back of the deck
+        self.rounds[shop] += 1
+        g = np.nonzero(shop)[0]
+        zone, order = self.zone[g], self.order[g]
+        held = (zone == HAND) | (zone == IN_PLAY)
+        key = np.where(zone == DECK, order, np.where(held, order + (BIG >> 1), BIG))
+        rank = np.argsort(np.argsort(key, 1, kind="stable"), 1, kind="stable")
+        self.order[g] = np.where(zone == DEAD, order, rank)
+        self.zone[g] = np.where(held, DECK, zone)
+        self.seq[g] = (zone != DEAD).sum(1)
+
+        self.ehp[g] = self.round_hp[self.rounds[g]]
+        self.eatk[g] = self.round_atk[self.rounds[g]]
+        self.alive[g] = True
+
+        for k in range(int(self.extra_draw[g].max(initial=0))):
+            self._draw_silent(shop & (self.extra_draw > k))
+
+    def _draw_silent(self, mask):
+        empty = mask & ~(self.zone == DECK).any(1)
+        for g in np.nonzero(empty)[0]:
+            self._refill_deck(g)
+        self._pop_deck(mask & (self.zone == DECK).any(1))
+
+    def _refill_deck(self, g):
+        # Rare path (extra draws exceeding the deck), so plain Python per game
+        cards = [int(c) for c in np.argsort(np.where(self.zone[g] == HAND, self.order[g], BIG), kind="stable")
+                 if self.zone[g, c] == HAND]
+        rng = StreamRNG.__new__(StreamRNG)
+        rng.key, rng.counter = int(self.keys[g]), int(self.draws[g])
+        rng.shuffle(cards)
+        self.draws[g] = np.uint64(rng.counter)
+        for c in cards:
+            self.zone[g, c] = DECK
+            self.order[g, c] = self.seq[g]
+            self.seq[g] += 1
+
+# --- Cross-check and benchmark ---
+def scalar_state(game):
+    # Engine game reduced to the batch layout: (rounds, over, won, hp, coins, extra_draw, cards);
+    # catalog card names can repeat, so cards compare as a sorted list
+    player = game.player
+    cards = sorted((c.name, c.zone, c.hp, c.attack) for c in chain(player.deck, player.hand, player.in_play))
+    return (game.rounds_completed, game.over, game.won, player.hp, player.coins, player.extra_draw, cards)
+
+def batch_state(sim, g):
+    cards = sorted((sim.names[c], int(sim.zone[g, c]), int(sim.hp[g, c]), int(sim.atk[g, c]))
+                   for c in range(sim.deck_size) if sim.zone[g, c] != DEAD)
+    return (int(sim.rounds[g]), bool(sim.over[g]), bool(sim.won[g]), int(sim.php[g]), int(sim.coins[g]),
+            int(sim.extra_draw[g]), cards)
+
+def cross_check(n_games=1000, seed=0, max_rounds=50, buy_order=("atk",), rules=DEFAULT_RULES):
+    sim = BatchSim(n_games, seed, max_rounds, buy_order, rules).run()
+    policy = lambda game: greedy_policy(game, buy_order)
+    mismatches = []
+    for g in range(n_games):
+        game = run_game(StreamRNG(seed, g), max_rounds, policy, rules)
+        if scalar_state(game) != batch_state(sim, g):
+            mismatches.append(g)
+    return mismatches
+
+def benchmark(n_games=10000, seed=0, max_rounds=50, scalar_games=2000):
+    start = time.perf_counter()
+    BatchSim(n_games, seed, max_rounds).run()
+    batch_rate = n_games / (time.perf_counter() - start)
+
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(scalar_games):
+        run_game(rng, max_rounds)
+    scalar_rate = scalar_games / (time.perf_counter() - start)
+    return batch_rate, scalar_rate
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched NumPy simulator for Generic Card Game")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-rounds", type=int, default=50)
+    parser.add_argument("--buy", default="atk", help="comma separated shop buy order, e.g. atk,hp,draw")
+    parser.add_argument("--catalog", help="catalog source (.json) to check against instead of the default rules")
+    parser.add_argument("--check", action="store_true", help="compare every game against the scalar engine")
+    args = parser.parse_args()
+    buy_order = tuple(args.buy.split(","))
+
+    if args.check:
+        rules = catalog_rules(load_source(args.catalog)) if args.catalog else DEFAULT_RULES
+        bad = cross_check(args.games, args.seed, args.max_rounds, buy_order, rules)
+        print(f"cross-check: {args.games - len(bad)}/{args.games} games match the scalar engine")
+        if bad:
+            print(f"first mismatches: {bad[:10]}")
+            raise SystemExit(1)
+    else:
+        batch_rate, scalar_rate = benchmark(args.games, args.seed, args.max_rounds)
+        print(f"batch:  {batch_rate:,.0f} sims/s")
+        print(f"scalar: {scalar_rate:,.0f} sims/s")
+        print(f"speedup: {batch_rate / scalar_rate:.1f}x")
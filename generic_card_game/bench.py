@@ -0,0 +1,218 @@
+# Benchmark suite for Generic Card Game. Runs headless (SDL dummy drivers) and
+# prints one JSON object:
+#
+#   engine   rounds/s through draw_card/play_card/start_next_round (greedy bot)
+#   frame    mean and p99 time of the battle and shop render paths, full hands,
+#            in an 800x600 window and at 1440p and 4K
+#   assets   cold (fresh process) and warm load of images/*.png, and full decode
+#            of music.mp3 as audio.py's worker does it
+#   memory   peak traced and resident memory across a 500-round run
+#
+#   python bench.py --out baseline.json
+#   python bench.py --compare baseline.json [--tolerance 0.15]
+#
+# Compare mode flags every metric that got worse than the baseline by more than
+# the tolerance (timings also by more than NOISE_MS) and exits with status 1 if
+# any did.
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import contextlib
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from engine import Game, Rules, run_game
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CARD_SIZE = (100, 150)  # genericcardgame.CARD_WIDTH/HEIGHT, without importing the front-end
+
+# metric -> True if bigger is better
+HIGHER_IS_BETTER = {"engine.rounds_per_s": True}
+# Timings this close are scheduler noise, whatever the percentage
+NOISE_MS = 0.5
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# --- Engine ---
+def bench_engine(seconds=2.0):
+    rng = random.Random(0)
+    rounds = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        game = run_game(rng, max_rounds=50)
+        rounds += game.rounds_completed + 1
+    return {"rounds_per_s": rounds / (time.perf_counter() - start)}
+
+# --- Frames ---
+# Window sizes the front-end is timed at, and their metric suffixes
+RESOLUTIONS = {"": (800, 600), "_1440p": (2560, 1440), "_4k": (3840, 2160)}
+
+def full_board():
+    # Six cards in hand and three in play: as crowded as the screen gets
+    game = Game(seed=0)
+    while len(game.player.hand) < 9:
+        game.begin_draw()
+    for _ in range(3):
+        game.begin_play(0)
+    return game
+
+def time_frames(gcg, frames, churn):
+    # Frame times of the front-end's render path; churn(frame) changes some
+    # state every few frames, like a click would
+    import pygame
+    times = []
+    for frame in range(frames):
+        if frame % 5 == 0:
+            churn(frame)
+        start = time.perf_counter()
+        gcg.step()
+        pygame.display.update(gcg.render_frame())
+        times.append(time.perf_counter() - start)
+    return {"mean_ms": sum(times) / len(times) * 1000, "p99_ms": percentile(times, 0.99) * 1000}
+
+def bench_frames(frames=600):
+    # Importing the front-end sets up the display, assets and game without
+    # entering its main loop
+    os.environ["GCG_SEED"] = "0"
+    os.environ["GCG_DIFFICULTY"] = "easy"
+    with contextlib.redirect_stdout(sys.stderr):
+        import genericcardgame as gcg
+    while gcg.assets.loading() or gcg.audio.waiting():
+        gcg.assets.poll()
+        gcg.audio.update()
+        time.sleep(0.001)
+
+    results = {}
+    for suffix, size in RESOLUTIONS.items():
+        gcg.set_window(size)
+        gcg.set_game(full_board())
+        cards = gcg.player.hand + gcg.player.in_play + gcg.game.enemy.in_play
+        def hit(frame):
+            card = cards[frame // 5 % len(cards)]
+            card.hp -= 1
+            card.flash_timer = 5
+        results["battle" + suffix] = time_frames(gcg, frames, hit)
+
+        game = full_board()
+        game.player.coins = 1000
+        game.start_shop()
+        gcg.set_game(game)
+        def buy(frame):
+            game.buy(("atk", "hp", "draw")[frame // 5 % 3])
+        results["shop" + suffix] = time_frames(gcg, frames, buy)
+    gcg.autosaver.close()
+    return results
+
+# --- Assets ---
+def load_assets():
+    import pygame
+    from assets import AssetManager
+    start = time.perf_counter()
+    AssetManager(os.path.join(BASE_DIR, "images"), CARD_SIZE).load_all()
+    images = time.perf_counter() - start
+    start = time.perf_counter()
+    pygame.mixer.Sound(os.path.join(BASE_DIR, "music.mp3"))
+    music = time.perf_counter() - start
+    return images * 1000, music * 1000
+
+def probe_assets():
+    # Runs in a fresh process: the first load is cold, the second warm
+    import pygame
+    pygame.init()
+    pygame.mixer.init()
+    pygame.display.set_mode((1, 1))
+    cold_images, cold_music = load_assets()
+    warm_images, warm_music = load_assets()
+    print(json.dumps({"images_cold_ms": cold_images, "images_warm_ms": warm_images,
+                      "music_decode_cold_ms": cold_music, "music_decode_warm_ms": warm_music}))
+
+def bench_assets():
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--probe-assets"],
+                         capture_output=True, text=True, check=True, cwd=BASE_DIR).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+# --- Memory ---
+def bench_memory(rounds=500):
+    # Player and cards that can't die, so the run lasts; the action log is recorded too
+    from engine import greedy_policy
+    rules = Rules(player_hp=10**9, card_hp=10**6)  # its catalog isn't game state
+    tracemalloc.start()
+    game = Game(seed=0, rules=rules, record=True)
+    while game.rounds_completed < rounds:
+        greedy_policy(game)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"peak_traced_kb": peak / 1024,
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+# --- Report ---
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+def compare(results, baseline, tolerance):
+    # Metrics that got worse than the baseline by more than tolerance
+    regressions = []
+    current = flatten(results)
+    for key, old in flatten(baseline).items():
+        new = current.get(key)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        worse = -change if HIGHER_IS_BETTER.get(key) else change
+        if key.endswith("_ms") and abs(new - old) < NOISE_MS:
+            continue
+        if worse > tolerance:
+            regressions.append({"metric": key, "baseline": old, "current": new,
+                                "change_pct": round(change * 100, 1)})
+    return regressions
+
+def run_all():
+    # Memory first, while the process is still small and tracemalloc cheap
+    memory = bench_memory()
+    return {
+        "engine": bench_engine(),
+        "frame": bench_frames(),
+        "assets": bench_assets(),
+        "memory": memory,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generic Card Game benchmarks")
+    parser.add_argument("--out", help="also write the results JSON here, e.g. to store a baseline")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against a stored results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown as a fraction")
+    parser.add_argument("--probe-assets", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe_assets:
+        probe_assets()
+        sys.exit()
+
+    results = run_all()
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            results["regressions"] = compare(results, json.load(f), args.tolerance)
+    print(json.dumps(results, indent=2))
+    if results.get("regressions"):
+        sys.exit(1)
@@ -0,0 +1,345 @@
+# Card and enemy catalogs.
+#
+# A catalog is a JSON file listing the cards (with rarity and ability), the
+# starting deck, the enemies and the few numbers that go with them (player HP,
+# round scaling, shop prices, the round that wins the game if there is one).
+# compile_source() validates one and packs it into
+# a compact binary table with every enemy's stats for each round worked out
+# ahead of time; load() reads that back with a single file read and a handful
+# of array copies, so a catalog of thousands of cards costs little more to load
+# than one of ten.
+#
+#   magic "GCGC" | version u8 | counts, player hp, scaling, shop prices, win round (HEADER)
+#   | string table (u32 length, "\0"-joined UTF-8)
+#   | card hp, attack (i32) | card ability (u16) | card rarity (u8)
+#   | starting deck (u32 card indices) | enemy hp, attack per round (i32, round-major)
+#
+# engine.Rules takes a Catalog; catalog_rules() in engine.py builds the Rules a
+# catalog file asks for. Abilities are names the catalog carries for the rules
+# to come; the engine doesn't act on them yet.
+#
+#   python catalog.py catalogs/roguelike.json      validate and compile (writes .gcgc)
+#   python catalog.py --check catalogs/*.json      validate only
+#   python catalog.py --bench 5000                 compile/load time, 10 vs 5000 cards
+
+import json
+import os
+import struct
+import time
+from array import array
+
+MAGIC = b"GCGC"
+VERSION = 2
+# cards, deck, enemies, rounds, abilities, player hp, round/attack scaling, shop atk/hp/draw, win rounds
+HEADER = struct.Struct("<4sBIIHHHidd3HH")
+COUNT = struct.Struct("<I")
+
+RARITIES = ("common", "uncommon", "rare", "legendary")
+NO_ABILITY = "none"
+DEFAULT_ROUNDS = 100
+WIN_ROUNDS = 0  # clearing this many rounds wins the game; 0 plays on for ever
+PLAYER_HP = 14
+SHOP_PRICES = {"atk": 2, "hp": 2, "draw": 3}
+
+TOP_KEYS = {"name", "player_hp", "round_scaling", "attack_scaling", "rounds", "win_rounds", "shop_prices", "cards",
+            "deck", "enemies"}
+CARD_KEYS = {"name", "hp", "attack", "image", "rarity", "ability"}
+ENEMY_KEYS = {"name", "hp", "attack", "image"}
+
+def scaled(value, round, scaling):
+    # Enemy stat in a given round; the table holds exactly these numbers
+    return int(value * (1 + round * scaling))
+
+# --- Compiling ---
+class _Checker:
+    # Collects every problem in a source so one run reports them all
+    def __init__(self):
+        self.errors = []
+
+    def int(self, where, value, low=0):
+        if type(value) is not int or value < low:
+            self.errors.append(f"{where}: expected an integer >= {low}, got {value!r}")
+            return low
+        return value
+
+    def number(self, where, value):
+        if type(value) not in (int, float) or value < 0:
+            self.errors.append(f"{where}: expected a number >= 0, got {value!r}")
+            return 0.0
+        return float(value)
+
+    def str(self, where, value, allow_empty=False):
+        if not isinstance(value, str) or (not value and not allow_empty) or "\0" in value:
+            self.errors.append(f"{where}: expected a non-empty string, got {value!r}")
+            return "?"
+        return value
+
+    def keys(self, where, entry, allowed, required=("name",)):
+        if not isinstance(entry, dict):
+            self.errors.append(f"{where}: expected an object")
+            return False
+        for key in sorted(entry.keys() - allowed):
+            self.errors.append(f"{where}: unknown key {key!r}")
+        missing = [key for key in required if key not in entry]
+        for key in missing:
+            self.errors.append(f"{where}: missing {key!r}")
+        return not missing
+
+    def list(self, where, value):
+        if not isinstance(value, list) or not value:
+            self.errors.append(f"{where}: expected a non-empty list")
+            return []
+        return value
+
+def compile_source(source):
+    # Validate a catalog (parsed JSON) and return its compiled bytes.
+    # Raises ValueError listing every problem found.
+    check = _Checker()
+    if not check.keys("catalog", source, TOP_KEYS, ("name", "cards", "enemies")):
+        raise ValueError("\n".join(check.errors))
+    name = check.str("name", source.get("name"))
+    player_hp = check.int("player_hp", source.get("player_hp", PLAYER_HP), 1)
+    round_scaling = check.number("round_scaling", source.get("round_scaling", 0))
+    attack_scaling = check.number("attack_scaling", source.get("attack_scaling", 0))
+    rounds = check.int("rounds", source.get("rounds", DEFAULT_ROUNDS), 1)
+    if rounds > 0xFFFF:
+        check.errors.append(f"rounds: at most {0xFFFF}, got {rounds}")
+        rounds = 1
+    win_rounds = check.int("win_rounds", source.get("win_rounds", WIN_ROUNDS))
+    if win_rounds > 0xFFFF:
+        check.errors.append(f"win_rounds: at most {0xFFFF}, got {win_rounds}")
+    prices = source.get("shop_prices", {})
+    if not check.keys("shop_prices", prices, set(SHOP_PRICES), ()):
+        prices = {}
+    prices = {stat: check.int(f"shop_prices.{stat}", prices.get(stat, price)) for stat, price in SHOP_PRICES.items()}
+    for stat, price in prices.items():
+        if price > 0xFFFF:
+            check.errors.append(f"shop_prices.{stat}: at most {0xFFFF}, got {price}")
+
+    card_names, card_images, hps, atks, rarities, ability_ids = [], [], [], [], [], []
+    abilities = {NO_ABILITY: 0}
+    index = {}
+    for i, card in enumerate(check.list("cards", source.get("cards"))):
+        where = f"cards[{i}]"
+        if not check.keys(where, card, CARD_KEYS, ("name", "hp", "attack")):
+            continue
+        card_name = check.str(f"{where}.name", card.get("name"))
+        if card_name in index:
+            check.errors.append(f"{where}.name: duplicate card {card_name!r}")
+        index[card_name] = len(card_names)
+        card_names.append(card_name)
+        card_images.append(check.str(f"{where}.image", card.get("image", ""), allow_empty=True))
+        hps.append(check.int(f"{where}.hp", card.get("hp"), 1))
+        atks.append(check.int(f"{where}.attack", card.get("attack")))
+        rarity = card.get("rarity", RARITIES[0])
+        if rarity not in RARITIES:
+            check.errors.append(f"{where}.rarity: expected one of {', '.join(RARITIES)}, got {rarity!r}")
+            rarity = RARITIES[0]
+        rarities.append(RARITIES.index(rarity))
+        ability = check.str(f"{where}.ability", card.get("ability", NO_ABILITY))
+        ability_ids.append(abilities.setdefault(ability, len(abilities)))
+
+    deck = []
+    for i, card_name in enumerate(check.list("deck", source.get("deck", card_names))):
+        if card_name not in index:
+            check.errors.append(f"deck[{i}]: unknown card {card_name!r}")
+        else:
+            deck.append(index[card_name])
+
+    enemy_names, enemy_images, enemy_hps, enemy_atks = [], [], [], []
+    for i, enemy in enumerate(check.list("enemies", source.get("enemies"))):
+        where = f"enemies[{i}]"
+        if not check.keys(where, enemy, ENEMY_KEYS, ("name", "hp", "attack")):
+            continue
+        enemy_names.append(check.str(f"{where}.name", enemy.get("name")))
+        enemy_images.append(check.str(f"{where}.image", enemy.get("image", ""), allow_empty=True))
+        enemy_hps.append(check.int(f"{where}.hp", enemy.get("hp"), 1))
+        enemy_atks.append(check.int(f"{where}.attack", enemy.get("attack")))
+    if len(enemy_names) > 0xFFFF or len(abilities) > 0xFFFF:
+        check.errors.append("too many enemies or abilities")
+    if check.errors:
+        raise ValueError("\n".join(check.errors))
+
+    hp_table = array("i", [scaled(hp, r, round_scaling) for r in range(rounds) for hp in enemy_hps])
+    atk_table = array("i", [scaled(atk, r, attack_scaling) for r in range(rounds) for atk in enemy_atks])
+    strings = [name, *card_names, *card_images, *enemy_names, *enemy_images, *abilities]
+    blob = "\0".join(strings).encode()
+    out = bytearray(HEADER.pack(MAGIC, VERSION, len(card_names), len(deck), len(enemy_names), rounds,
+                                len(abilities), player_hp, round_scaling, attack_scaling,
+                                *(prices[stat] for stat in SHOP_PRICES), win_rounds))
+    out += COUNT.pack(len(blob))
+    out += blob
+    for column in (array("i", hps), array("i", atks), array("H", ability_ids), array("B", rarities),
+                   array("I", deck), hp_table, atk_table):
+        out += column.tobytes()
+    return bytes(out)
+
+# --- Loading ---
+class Catalog:
+    def __init__(self, data):
+        data = memoryview(data)
+        (magic, version, n_cards, n_deck, n_enemies, self.rounds, n_abilities, self.player_hp,
+         self.round_scaling, self.attack_scaling, *prices, self.win_rounds) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a compiled Generic Card Game catalog")
+        if version != VERSION:
+            raise ValueError(f"catalog version {version}, expected {VERSION}")
+        self.shop_prices = dict(zip(SHOP_PRICES, prices))
+        at = HEADER.size
+        (length,) = COUNT.unpack_from(data, at)
+        at += COUNT.size
+        strings = str(data[at:at + length], "utf-8").split("\0")
+        at += length
+        self.name = strings[0]
+        at_image, at_enemy = 1 + n_cards, 1 + 2 * n_cards
+        self.card_names = strings[1:at_image]
+        self.card_images = [s or None for s in strings[at_image:at_enemy]]
+        self.enemy_names = strings[at_enemy:at_enemy + n_enemies]
+        self.enemy_images = [s or None for s in strings[at_enemy + n_enemies:at_enemy + 2 * n_enemies]]
+        self.abilities = strings[at_enemy + 2 * n_enemies:]
+
+        def column(typecode, n):
+            nonlocal at
+            values = array(typecode)
+            values.frombytes(data[at:at + n * values.itemsize])
+            at += n * values.itemsize
+            return values
+
+        table = self.rounds * n_enemies
+        self.card_hp = column("i", n_cards)
+        self.card_atk = column("i", n_cards)
+        self.card_ability = column("H", n_cards)
+        self.card_rarity = column("B", n_cards)
+        self.deck = column("I", n_deck)
+        self.enemy_hp = column("i", table)  # round * enemies + enemy
+        self.enemy_atk = column("i", table)
+        if len(strings) != at_enemy + 2 * n_enemies + n_abilities or at != len(data):
+            raise ValueError("truncated or corrupt catalog")
+        self.starting_deck = [(self.card_names[i], self.card_hp[i], self.card_atk[i], self.card_images[i])
+                              for i in self.deck]
+        # The rows enemies_for() hands out, so a new round only copies stats into cards
+        n = n_enemies
+        self.rows = [[(self.enemy_names[e], self.enemy_hp[r * n + e], self.enemy_atk[r * n + e], self.enemy_images[e])
+                      for e in range(n)] for r in range(self.rounds)]
+        self.index = None
+
+    def enemies_for(self, round):
+        # (name, hp, attack, image) of each enemy in round (0 = the first)
+        n = len(self.enemy_names)
+        if round < self.rounds:
+            return self.rows[round]
+        # Past the table the stats come from the round-0 row and the same formula
+        return [(self.enemy_names[e], scaled(self.enemy_hp[e], round, self.round_scaling),
+                 scaled(self.enemy_atk[e], round, self.attack_scaling), self.enemy_images[e])
+                for e in range(n)]
+
+    def card(self, name):
+        # Definition of a card by name: (hp, attack, image, rarity, ability)
+        if self.index is None:
+            self.index = {n: i for i, n in enumerate(self.card_names)}
+        i = self.index[name]
+        return (self.card_hp[i], self.card_atk[i], self.card_images[i],
+                RARITIES[self.card_rarity[i]], self.abilities[self.card_ability[i]])
+
+def build(source):
+    # Catalog straight from a source dict, e.g. one generated in code
+    return Catalog(compile_source(source))
+
+def load(path):
+    with open(path, "rb") as f:
+        return Catalog(f.read())
+
+def compiled_path(source_path):
+    return os.path.splitext(source_path)[0] + ".gcgc"
+
+def compile_file(source_path):
+    with open(source_path, encoding="utf-8") as f:
+        source = json.load(f)
+    try:
+        data = compile_source(source)
+    except ValueError as e:
+        raise ValueError(f"{source_path}:\n{e}") from None
+    out = compiled_path(source_path)
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, out)
+    return out
+
+def load_source(source_path):
+    # Load a catalog's compiled table, compiling it first if it is missing,
+    # older than its source or from another catalog version
+    out = compiled_path(source_path)
+    if not os.path.exists(out) or os.path.getmtime(out) < os.path.getmtime(source_path):
+        compile_file(source_path)
+        return load(out)
+    try:
+        return load(out)
+    except ValueError:
+        compile_file(source_path)
+        return load(out)
+
+# --- Benchmark ---
+def generated_source(n_cards, n_enemies=3):
+    return {
+        "name": f"generated-{n_cards}",
+        "round_scaling": 0.2,
+        "cards": [{"name": f"Card{i}", "hp": 2 + i % 50, "attack": 1 + i % 30, "image": f"card{i % 10}.png",
+                   "rarity": RARITIES[i % len(RARITIES)], "ability": ("none", "thorns", "lifesteal")[i % 3]}
+                  for i in range(n_cards)],
+        "deck": [f"Card{i}" for i in range(min(n_cards, 10))],
+        "enemies": [{"name": f"Enemy{i}", "hp": 2 + i, "attack": 1 + i % 2} for i in range(n_enemies)],
+    }
+
+def bench(sizes, repeat=200):
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            source_path = os.path.join(tmp, f"cards{n}.json")
+            with open(source_path, "w") as f:
+                json.dump(generated_source(n), f)
+            start = time.perf_counter()
+            out = compile_file(source_path)
+            compile_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            for _ in range(repeat):
+                catalog = load(out)
+            load_us = (time.perf_counter() - start) / repeat * 1e6
+            start = time.perf_counter()
+            for _ in range(max(1, repeat // 10)):
+                with open(source_path, encoding="utf-8") as f:
+                    compile_source(json.load(f))
+            json_us = (time.perf_counter() - start) / max(1, repeat // 10) * 1e6
+            print(f"{n:>6} cards: {os.path.getsize(out):>8,} bytes, compile {compile_ms:7.2f} ms, "
+                  f"load {load_us:8.1f} us (parsing the JSON instead: {json_us:9.1f} us), "
+                  f"{len(catalog.card_names)} cards")
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Validate and compile Generic Card Game catalogs")
+    parser.add_argument("sources", nargs="*")
+    parser.add_argument("--check", action="store_true", help="validate only, write nothing")
+    parser.add_argument("--bench", type=int, metavar="N", help="time compiling and loading 10 and N cards")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench([10, args.bench])
+    failed = False
+    for path in args.sources:
+        try:
+            if args.check:
+                with open(path, encoding="utf-8") as f:
+                    compile_source(json.load(f))
+                print(f"{path}: OK")
+            else:
+                catalog = load(compile_file(path))
+                print(f"{path} -> {compiled_path(path)}: {len(catalog.card_names)} cards, "
+                      f"deck of {len(catalog.deck)}, {len(catalog.enemy_names)} enemies, "
+                      f"{catalog.rounds} rounds precomputed")
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}" if isinstance(e, OSError) else e)
+            failed = True
+    if failed:
+        raise SystemExit(1)
+    if not args.sources and not args.bench:
+        parser.error("give catalog sources to compile, or --bench N")
@@ -0,0 +1,166 @@
+# Structured combat log for engine.Game.
+#
+# The engine reports what happens as typed records (kind, actor, target,
+# amount, resulting HP, round) instead of formatted strings. CombatLog keeps
+# the most recent records in a preallocated ring buffer and, given a sink such
+# as print, formats and writes them on a background thread, so a slow stdout
+# never holds up a frame. Records below the log's level are dropped on entry.
+# Game(log=None) skips all of it behind a single attribute check.
+#
+# A plain callable still works as a log (Game(log=print)): as_log wraps it so
+# it receives each record as the text it always printed.
+
+import os
+import threading
+import time
+from array import array
+
+# --- Record kinds ---
+DRAW = 0  # actor drawn
+SILENT_DRAW = 1  # actor drawn by a shop extra draw
+NO_CARDS = 2
+ENEMY_ATTACK = 3  # actor hits target card for amount, target left with hp
+ENEMY_HITS_PLAYER = 4  # actor hits the player for amount, player left with hp
+PLAYER_ATTACK = 5  # actor card hits target enemy for amount, target left with hp
+CARD_DEFEATED = 6  # actor, a player card
+ENEMY_DEFEATED = 7  # actor, an enemy
+SHOP_OPEN = 8  # amount coins to spend
+SHOP_APPLIED = 9  # target describes the purchases
+ROUND_START = 10
+
+# Levels, lowest first; a log keeps records at or above its level
+DETAIL = 10
+COMBAT = 20
+EVENTS = 30
+LEVELS = (DETAIL, DETAIL, EVENTS, COMBAT, COMBAT, COMBAT, EVENTS, EVENTS, EVENTS, EVENTS, EVENTS)
+
+def format_record(kind, actor, target, amount, hp, round):
+    if kind == DRAW:
+        return f"Drew {actor}"
+    if kind == SILENT_DRAW:
+        return f"Silently drew {actor}"
+    if kind == NO_CARDS:
+        return "No more cards to draw!"
+    if kind == ENEMY_ATTACK:
+        return f"{actor} attacks {target}! HP now {hp}"
+    if kind == ENEMY_HITS_PLAYER:
+        return f"{actor} attacks player! Player HP now {hp}"
+    if kind == PLAYER_ATTACK:
+        return f"{actor} attacks {target} for {amount}! HP now {hp}"
+    if kind == CARD_DEFEATED:
+        return f"{actor} is defeated!"
+    if kind == ENEMY_DEFEATED:
+        return f"{actor} defeated!"
+    if kind == SHOP_OPEN:
+        return f"Entering shop with {amount} coins!"
+    if kind == SHOP_APPLIED:
+        return f"Shop applied: {target}"
+    return f"Starting round {round}!"
+
+class CombatLog:
+    def __init__(self, capacity=4096, level=DETAIL, sink=None, flush_interval=0.05):
+        self.capacity = capacity
+        self.level = level
+        self.kinds = array("b", bytes(capacity))
+        self.actors = [""] * capacity
+        self.targets = [""] * capacity
+        self.amounts = array("i", bytes(4 * capacity))
+        self.hps = array("i", bytes(4 * capacity))
+        self.rounds = array("i", bytes(4 * capacity))
+        self.count = 0  # records ever kept; the newest is at (count - 1) % capacity
+        self.sink = sink
+        self.written = 0
+        self.dropped = 0
+        self.flush_interval = flush_interval
+        self.closed = threading.Event()
+        self.thread = None
+        if sink:
+            self.thread = threading.Thread(target=self._run, name="combatlog", daemon=True)
+            self.thread.start()
+
+    def record(self, kind, actor, target, amount, hp, round):
+        if LEVELS[kind] < self.level:
+            return
+        i = self.count % self.capacity
+        self.kinds[i] = kind
+        self.actors[i] = actor
+        self.targets[i] = target
+        self.amounts[i] = amount
+        self.hps[i] = hp
+        self.rounds[i] = round
+        self.count += 1  # publish last, the writer only reads below count
+
+    def text(self, seq):
+        # Formatted record number seq, which must still be in the ring
+        i = seq % self.capacity
+        return format_record(self.kinds[i], self.actors[i], self.targets[i],
+                             self.amounts[i], self.hps[i], self.rounds[i])
+
+    def recent(self, n):
+        # Sequence numbers of the last n records, oldest first
+        return range(max(0, self.count - min(n, self.capacity)), self.count)
+
+    # --- Background writer ---
+    def flush(self):
+        end = self.count
+        if end - self.written > self.capacity:
+            # The ring lapped the writer; those records are gone
+            self.dropped += end - self.written - self.capacity
+            self.written = end - self.capacity
+        for seq in range(self.written, end):
+            self.sink(self.text(seq))
+        self.written = end
+
+    def _run(self):
+        # Polls instead of being signalled, so record() never takes a lock
+        while not self.closed.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def close(self):
+        self.closed.set()
+        if self.thread:
+            self.thread.join()
+
+class TextLog:
+    # Formats every record straight away for a print-style callable
+    def __init__(self, write):
+        self.write = write
+
+    def record(self, kind, actor, target, amount, hp, round):
+        self.write(format_record(kind, actor, target, amount, hp, round))
+
+def as_log(log):
+    if log is None or hasattr(log, "record"):
+        return log
+    return TextLog(log)
+
+if __name__ == "__main__":
+    # python combatlog.py: time greedy bot games with each kind of log
+    import random
+    from engine import Game, greedy_policy
+
+    def bench(log, games=2000):
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for _ in range(games):
+            game = Game(rng=rng, log=log)
+            while not game.over and game.rounds_completed < 50:
+                if not game.has_moves():
+                    break
+                greedy_policy(game)
+        return (time.perf_counter() - start) / games * 1e6
+
+    with open(os.devnull, "w") as devnull:
+        write = lambda message: print(message, file=devnull)
+        for name, log in [
+            ("disabled", None),
+            ("print", write),
+            ("ring buffer", CombatLog()),
+            ("ring buffer, events only", CombatLog(level=EVENTS)),
+            ("ring buffer + writer", CombatLog(sink=write)),
+        ]:
+            us = bench(log)
+            if isinstance(log, CombatLog):
+                log.close()
+            print(f"{name:>24}: {us:6.1f} us per game")
@@ -0,0 +1,629 @@
+# Headless rules engine for Generic Card Game.
+# No pygame in here: cards are plain records and a Game object owns all of the
+# state that used to live in module globals, so bots, balance scripts and the
+# pygame front-end can all drive the same rules.
+
+import bisect
+import hashlib
+import heapq
+import random
+from collections import deque
+from itertools import chain
+from operator import attrgetter
+
+from catalog import build as build_catalog
+from combatlog import (CARD_DEFEATED, DRAW, ENEMY_ATTACK, ENEMY_DEFEATED, ENEMY_HITS_PLAYER, NO_CARDS,
+                       PLAYER_ATTACK, ROUND_START, SHOP_APPLIED, SHOP_OPEN, SILENT_DRAW, as_log)
+
+# --- Rules constants ---
+PLAYER_HP = 14
+START_DECK_SIZE = 10
+START_HAND_SIZE = 3
+ROUND_SCALING = 0.2
+SHOP_PRICES = {"atk": 2, "hp": 2, "draw": 3}
+
+# name, base hp, attack, image file
+ENEMY_TYPES = [
+    ("Treyvon", 2, 2, "treyvon.png"),
+    ("Stonks", 3, 1, "stonks.png"),
+    ("JD Vance", 1, 1, "vance.png"),
+]
+
+# Tunables of one ruleset; the module constants above are the shipped game.
+# Cards and enemies come from a compiled catalog (catalog.py). Without one, a
+# catalog is generated from deck_size/card_hp/card_atk and ENEMY_TYPES.
+# win_rounds > 0 ends the game, won, once that many rounds are cleared.
+class Rules:
+    def __init__(self, player_hp=PLAYER_HP, round_scaling=ROUND_SCALING, shop_prices=None,
+                 deck_size=START_DECK_SIZE, card_hp=2, card_atk=1, catalog=None, win_rounds=0):
+        self.player_hp = player_hp
+        self.round_scaling = round_scaling
+        self.win_rounds = win_rounds
+        self.shop_prices = dict(SHOP_PRICES, **(shop_prices or {}))
+        self.deck_size = deck_size
+        self.card_hp = card_hp  # Card{i} starts with card_hp+i HP
+        self.card_atk = card_atk  # ...and card_atk+i attack
+        if catalog is None:
+            catalog = build_catalog({
+                "name": "generated",
+                "player_hp": player_hp,
+                "round_scaling": round_scaling,
+                "win_rounds": win_rounds,
+                "shop_prices": self.shop_prices,
+                "cards": [{"name": f"Card{i}", "hp": card_hp+i, "attack": card_atk+i, "image": f"card{i}.png"}
+                          for i in range(deck_size)],
+                "enemies": [{"name": name, "hp": hp, "attack": attack, "image": image}
+                            for name, hp, attack, image in ENEMY_TYPES],
+            })
+        else:
+            self.deck_size = len(catalog.deck)
+        self.catalog = catalog
+
+def catalog_rules(catalog):
+    # The ruleset a catalog file describes
+    return Rules(player_hp=catalog.player_hp, round_scaling=catalog.round_scaling,
+                 shop_prices=catalog.shop_prices, catalog=catalog, win_rounds=catalog.win_rounds)
+
+DEFAULT_RULES = Rules()
+
+SHOP_STATS = ("atk", "hp", "draw")
+
+# Recorded actions are one byte each: draw, confirm, buy <stat>, play <hand index>
+ACT_DRAW = 0
+ACT_CONFIRM = 1
+ACT_BUY = 2  # + index into SHOP_STATS
+ACT_PLAY = 5  # + hand index
+ACT_PLAY_WIDE = 255  # followed by a two-byte hand index
+ACT_PLAN = 254  # followed by a count byte and that many enemy target indices
+
+# Card zones
+DECK = 0
+HAND = 1
+IN_PLAY = 2
+DEAD = 3
+ZONE_NAMES = ("deck", "hand", "in-play", "dead")
+
+# --- AI Overlord ---
+class OverlordAI:
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self.messages = [
+            "You again? Wonderful...",
+            "Play faster, human.",
+            "Oh great, another card. I'm *thrilled*.",
+            "Maybe you’ll win this time. Doubtful.",
+            "I would’ve played a better card.",
+            "You call that a strategy?",
+            "Hurry up before I fall asleep.",
+            "You're still here? Impressive. And sad.",
+            "Even the 'Meme' card is doing better than you."
+        ]
+        self.current_message = "Welcome to your doom, player."
+
+    def say_random(self):
+        self.current_message = self.rng.choice(self.messages)
+
+# Stand-in for look-ahead copies, so searching never touches the real taunt stream
+class QuietAI:
+    current_message = ""
+
+    def say_random(self):
+        pass
+
+QUIET_AI = QuietAI()
+
+# --- State ---
+class Card:
+    __slots__ = ("name", "hp", "attack", "zone", "seq", "is_enemy", "is_dead", "flash_timer", "image", "__weakref__")
+
+    def __init__(self, name, hp, attack, is_enemy=False, image=None):
+        self.name = name
+        self.hp = hp
+        self.attack = attack
+        self.zone = DECK
+        self.seq = 0  # when it entered the hand; hand and in-play keep this order
+        self.is_enemy = is_enemy
+        self.is_dead = False
+        self.flash_timer = 0
+        self.image = image  # file name under images/, loaded by the front-end
+
+    def copy(self):
+        c = Card.__new__(Card)
+        c.name = self.name
+        c.hp = self.hp
+        c.attack = self.attack
+        c.zone = self.zone
+        c.seq = self.seq
+        c.is_enemy = self.is_enemy
+        c.is_dead = self.is_dead
+        c.flash_timer = 0
+        c.image = self.image
+        return c
+
+by_seq = attrgetter("seq")
+
+class Player:
+    def __init__(self, hp=PLAYER_HP):
+        self.hp = hp
+        self.deck = deque()
+        self.hand = []
+        self.in_play = []
+        self.graveyard = []
+        self.coins = 0
+        self.extra_draw = 0
+        self.next_seq = 0
+
+    def held(self):
+        # Hand and in-play cards together in the order they were drawn
+        return sorted(self.hand + self.in_play, key=by_seq)
+
+class Enemy:
+    def __init__(self):
+        self.in_play = []
+
+class Game:
+    # Pass a seed for a reproducible session, or an rng object with
+    # choice/shuffle (e.g. batchsim.StreamRNG) to drive the rules directly.
+    def __init__(self, rng=None, log=None, rules=DEFAULT_RULES, seed=None, record=False):
+        if rng is None and seed is None:
+            seed = random.randrange(2**63)
+        self.seed = seed
+        self.rng = rng or random.Random(seed)
+        self.log = as_log(log)  # CombatLog, print-style callable, or None for silence
+        self.rules = rules
+        self.actions = bytearray() if record else None
+        self.player = Player(rules.player_hp)
+        self.enemy = Enemy()
+        self.ai = OverlordAI(random.Random(f"overlord:{seed}") if seed is not None else None)
+        self.rounds_completed = 0
+        self.in_shop = False
+        self.shop_selected = {"atk":0,"hp":0,"draw":0}
+        self.enemy_last_in_play = []
+        self.over = False  # lost
+        self.won = False  # cleared rules.win_rounds rounds; ends the game like over
+        self.enemy_plan = None  # target indices for the next enemy turn, e.g. from overlord.py
+
+        for name, hp, attack, image in rules.catalog.starting_deck:
+            self.player.deck.append(Card(name, hp=hp, attack=attack, image=image))
+        for _ in range(START_HAND_SIZE):
+            self._to_hand(self.player.deck.popleft())
+
+        self.enemy.in_play = self.setup_enemy()
+
+    # --- Rules ---
+    def setup_enemy(self):
+        # Stats for the round come scaled from the catalog's table
+        enemies = []
+        for name, hp, attack, image in self.rules.catalog.enemies_for(self.rounds_completed):
+            c = Card(name, hp=hp, attack=attack, is_enemy=True, image=image)
+            c.zone = IN_PLAY
+            enemies.append(c)
+        return enemies
+
+    def _to_hand(self, c):
+        player = self.player
+        c.zone = HAND
+        c.seq = player.next_seq
+        player.next_seq += 1
+        player.hand.append(c)
+
+    def _refill_deck(self):
+        # If deck is empty, shuffle the cards in hand back into deck
+        player = self.player
+        if not player.hand:
+            if self.log:
+                self.log.record(NO_CARDS, "", "", 0, self.player.hp, self.rounds_completed + 1)
+            return False
+        to_shuffle = player.hand
+        player.hand = []
+        self.rng.shuffle(to_shuffle)
+        for c in to_shuffle:
+            c.zone = DECK
+        player.deck.extend(to_shuffle)
+        return True
+
+    def draw_card(self):
+        if not self.begin_draw():
+            return False
+        self.exchange()
+        return True
+
+    def begin_draw(self):
+        # The player's half of a draw; exchange() is the enemies' answer
+        if not self.player.deck and not self._refill_deck():
+            return False
+        c = self.player.deck.popleft()
+        self._to_hand(c)
+        if self.log:
+            self.log.record(DRAW, c.name, "", 0, c.hp, self.rounds_completed + 1)
+        return True
+
+    def exchange(self):
+        self.ai.say_random()
+        self.enemy_turn()
+        self.player_attack()
+
+    def draw_card_silent(self):
+        # Extra draws granted by the shop don't spend a turn
+        if not self.player.deck and not self._refill_deck():
+            return False
+        c = self.player.deck.popleft()
+        self._to_hand(c)
+        if self.log:
+            self.log.record(SILENT_DRAW, c.name, "", 0, c.hp, self.rounds_completed + 1)
+        return True
+
+    def play_card(self, card):
+        self._play_index(self.player.hand.index(card))
+
+    def _play_index(self, index):
+        self.begin_play(index)
+        self.exchange()
+
+    def begin_play(self, index):
+        # Hand and in-play stay ordered lists: hand indices are the recorded
+        # play codes and in-play order decides targeting and attack order, so
+        # a move is a pop and a bisected insert (a memmove), never a scan
+        player = self.player
+        card = player.hand.pop(index)
+        card.zone = IN_PLAY
+        # In-play cards keep draw order
+        in_play = player.in_play
+        if not in_play or in_play[-1].seq < card.seq:
+            in_play.append(card)
+        else:
+            in_play.insert(bisect.bisect(in_play, card.seq, key=by_seq), card)
+
+    def enemy_turn(self):
+        in_play = self.player.in_play
+        for card in self.enemy.in_play:
+            self.enemy_attack(card, self.pick_target() if in_play else None)
+        self.enemy_plan = None
+
+    def pick_target(self):
+        # Slot (in-play index) of the planned target if the overlord searched
+        # this turn, otherwise of a random one; choice over a range draws
+        # exactly what choice over the cards did
+        in_play = self.player.in_play
+        if self.enemy_plan:
+            return self.enemy_plan.pop(0) % len(in_play)
+        return self.rng.choice(range(len(in_play)))
+
+    def enemy_attack(self, card, slot):
+        # One enemy attack on the player card in slot, or on the player when slot is None
+        player = self.player
+        if slot is None:
+            player.hp -= card.attack
+            if self.log:
+                self.log.record(ENEMY_HITS_PLAYER, card.name, "player", card.attack, player.hp, self.rounds_completed + 1)
+            return
+        target = player.in_play[slot]
+        target.hp -= card.attack
+        target.flash_timer = 5
+        if self.log:
+            self.log.record(ENEMY_ATTACK, card.name, target.name, card.attack, target.hp, self.rounds_completed + 1)
+        if target.hp <= 0:
+            if self.log:
+                self.log.record(CARD_DEFEATED, target.name, "", 0, target.hp, self.rounds_completed + 1)
+            del player.in_play[slot]
+            target.zone = DEAD
+            target.is_dead = True
+            player.graveyard.append(target)
+
+    def player_attack(self):
+        in_play = self.enemy.in_play
+        for card in self.player.in_play:
+            if not in_play:
+                break
+            target = in_play[0]
+            target.hp -= card.attack
+            target.flash_timer = 5
+            if self.log:
+                self.log.record(PLAYER_ATTACK, card.name, target.name, card.attack, target.hp, self.rounds_completed + 1)
+            if target.hp <= 0:
+                if self.log:
+                    self.log.record(ENEMY_DEFEATED, target.name, "", 0, target.hp, self.rounds_completed + 1)
+                self.enemy_last_in_play.append({'name': target.name, 'coins': max(1, target.attack)})
+                del in_play[0]
+                target.zone = DEAD
+                target.is_dead = True
+
+    def start_shop(self):
+        self.in_shop = True
+        self.shop_selected = {"atk":0,"hp":0,"draw":0}
+        self.player.coins += sum(c['coins'] for c in self.enemy_last_in_play)
+        self.enemy_last_in_play.clear()
+        if self.log:
+            self.log.record(SHOP_OPEN, "", "", self.player.coins, self.player.hp, self.rounds_completed + 1)
+
+    def apply_shop(self):
+        player = self.player
+        player.extra_draw += self.shop_selected["draw"]
+        atk, hp = self.shop_selected["atk"], self.shop_selected["hp"]
+        if atk or hp:
+            for c in chain(player.deck, player.hand, player.in_play):
+                c.attack += atk
+                c.hp += hp
+        self.in_shop = False
+        if self.log:
+            self.log.record(SHOP_APPLIED, "", str(self.shop_selected), 0, player.hp, self.rounds_completed + 1)
+
+    def start_next_round(self):
+        player = self.player
+        self.rounds_completed += 1
+
+        # Recycle cards in hand and in play back into deck, in draw order
+        for c in chain(player.hand, player.in_play):
+            c.zone = DECK
+        player.deck.extend(heapq.merge(player.hand, player.in_play, key=by_seq))
+        player.hand = []
+        player.in_play = []
+
+        self.enemy.in_play = self.setup_enemy()
+
+        for _ in range(player.extra_draw):
+            self.draw_card_silent()
+
+        if self.log:
+            self.log.record(ROUND_START, "", "", 0, player.hp, self.rounds_completed + 1)
+
+    def check_round_end(self):
+        # Game over takes priority over clearing the board in the same exchange;
+        # clearing the winning round ends the game instead of opening the shop
+        if self.in_shop or self.over or self.won:
+            return
+        if self.player.hp <= 0:
+            self.over = True
+        elif not self.enemy.in_play:
+            win_rounds = self.rules.win_rounds
+            if win_rounds and self.rounds_completed + 1 >= win_rounds:
+                self.won = True
+            else:
+                self.start_shop()
+
+    # --- Actions ---
+    # These mirror the buttons of the pygame front-end.
+    def hand_cards(self):
+        return self.player.hand
+
+    def in_play_cards(self):
+        return self.player.in_play
+
+    def has_moves(self):
+        if self.over or self.won:
+            return False
+        if self.in_shop:
+            return True
+        return bool(self.player.deck or self.player.hand)
+
+    def draw(self):
+        if self.over or self.won or self.in_shop:
+            return False
+        plan = self.enemy_plan and list(self.enemy_plan)
+        drew = self.draw_card()
+        if drew and self.actions is not None:
+            self._record_plan(plan)
+            self.actions.append(ACT_DRAW)
+        self.enemy_plan = None
+        self.check_round_end()
+        return drew
+
+    def play(self, index):
+        if self.over or self.won or self.in_shop:
+            return False
+        if not 0 <= index < len(self.player.hand):
+            return False
+        if self.actions is not None:
+            self._record_plan(self.enemy_plan)
+            if ACT_PLAY + index < ACT_PLAN:  # codes from ACT_PLAN up mark other records
+                self.actions.append(ACT_PLAY + index)
+            else:
+                self.actions.append(ACT_PLAY_WIDE)
+                self.actions += index.to_bytes(2, "little")
+        self._play_index(index)
+        self.check_round_end()
+        return True
+
+    def _record_plan(self, plan):
+        # Searched targets are logged ahead of their action so replays stay exact
+        if plan:
+            self.actions.append(ACT_PLAN)
+            self.actions.append(len(plan))
+            self.actions += bytes(plan)
+
+    def buy(self, stat):
+        price = self.rules.shop_prices[stat]
+        if not self.in_shop or self.player.coins < price:
+            return False
+        self.shop_selected[stat] += 1
+        self.player.coins -= price
+        if self.actions is not None:
+            self.actions.append(ACT_BUY + SHOP_STATS.index(stat))
+        return True
+
+    def confirm(self):
+        if not self.in_shop:
+            return False
+        if self.actions is not None:
+            self.actions.append(ACT_CONFIRM)
+        self.apply_shop()
+        self.start_next_round()
+        return True
+
+    def apply_action(self, code, index=0, plan=None):
+        # Re-execute one recorded action; index is only used by ACT_PLAY_WIDE,
+        # plan only by ACT_PLAN
+        if code == ACT_PLAN:
+            self.enemy_plan = list(plan)
+            return True
+        if code == ACT_DRAW:
+            return self.draw()
+        if code == ACT_CONFIRM:
+            return self.confirm()
+        if code < ACT_PLAY:
+            return self.buy(SHOP_STATS[code - ACT_BUY])
+        return self.play(index if code == ACT_PLAY_WIDE else code - ACT_PLAY)
+
+    def resolve_round(self, policy=None, plan=None):
+        # Fast-forward: play the rest of the round in one go under policy (a
+        # battle move chooser like greedy_move or Solver.best_move), going
+        # through draw()/play() so the moves are recorded as if clicked.
+        # plan(game, move), if given, picks the enemies' targets for each move
+        # the way the overlord would. Stops in the shop, at game over or when
+        # the player is out of moves, and says what happened on the way.
+        policy = policy or greedy_move
+        summary = RoundSummary(self)
+        while not (self.in_shop or self.over) and self.has_moves():
+            move = policy(self)
+            if plan:
+                self.enemy_plan = plan(self, move)
+            if not (self.draw() if move == ACT_DRAW else self.play(move - ACT_PLAY)):
+                break
+            summary.moves += 1
+        return summary.finish(self)
+
+    def clone(self, rng=None):
+        # Independent copy for look-ahead: fresh cards, no logging, recording or
+        # taunts. Pass rng to avoid copying the real one (search does)
+        g = Game.__new__(Game)
+        g.seed = self.seed
+        if rng is None:
+            rng = random.Random()
+            rng.setstate(self.rng.getstate())
+        g.rng = rng
+        g.log = None
+        g.rules = self.rules
+        g.actions = None
+        player, p = self.player, Player.__new__(Player)
+        p.hp = player.hp
+        p.deck = deque([c.copy() for c in player.deck])
+        p.hand = [c.copy() for c in player.hand]
+        p.in_play = [c.copy() for c in player.in_play]
+        p.graveyard = []
+        p.coins = player.coins
+        p.extra_draw = player.extra_draw
+        p.next_seq = player.next_seq
+        g.player = p
+        g.enemy = Enemy()
+        g.enemy.in_play = [c.copy() for c in self.enemy.in_play]
+        g.ai = QUIET_AI
+        g.rounds_completed = self.rounds_completed
+        g.in_shop = self.in_shop
+        g.shop_selected = dict(self.shop_selected)
+        g.enemy_last_in_play = list(self.enemy_last_in_play)
+        g.over = self.over
+        g.won = self.won
+        g.enemy_plan = None
+        return g
+
+    def snapshot(self):
+        # clone() plus the graveyard: everything restore() needs to bring this
+        # position back, e.g. for undo
+        g = self.clone()
+        g.player.graveyard = [c.copy() for c in self.player.graveyard]
+        return g
+
+    def restore(self, snapshot):
+        # Take over a snapshot's position and rng state in place, keeping this
+        # game's log, recording, AI and anything wrapped around it. The
+        # snapshot's cards become this game's, so restore each one once.
+        self.rng.setstate(snapshot.rng.getstate())
+        self.player = snapshot.player
+        self.enemy = snapshot.enemy
+        self.rounds_completed = snapshot.rounds_completed
+        self.in_shop = snapshot.in_shop
+        self.shop_selected = snapshot.shop_selected
+        self.enemy_last_in_play = snapshot.enemy_last_in_play
+        self.over = snapshot.over
+        self.won = snapshot.won
+        self.enemy_plan = None
+
+    def state_hash(self):
+        # Digest of everything that decides how the game continues (won
+        # follows from the round, the empty enemy line and the rules)
+        player = self.player
+        state = (
+            self.rounds_completed, self.in_shop, self.over,
+            player.hp, player.coins, player.extra_draw,
+            [(c.name, c.hp, c.attack) for c in player.deck],
+            [(c.name, c.hp, c.attack, ZONE_NAMES[c.zone]) for c in player.held()],
+            [(c.name, c.hp, c.attack) for c in self.enemy.in_play],
+            sorted(self.shop_selected.items()),
+            [(e['name'], e['coins']) for e in self.enemy_last_in_play],
+            self.rng.getstate() if hasattr(self.rng, "getstate") else None,
+        )
+        return hashlib.blake2b(repr(state).encode(), digest_size=16).digest()
+
+class RoundSummary:
+    # Before and after of one resolve_round, for the front-end's summary
+    def __init__(self, game):
+        player = game.player
+        self.moves = 0
+        self.hp = player.hp
+        self.cards_lost = len(player.graveyard)
+        self.enemies_defeated = len(game.enemy.in_play)
+        self.coins = player.coins
+
+    def finish(self, game):
+        player = game.player
+        self.hp_lost = self.hp - max(player.hp, 0)
+        self.cards_lost = len(player.graveyard) - self.cards_lost
+        self.enemies_defeated -= len(game.enemy.in_play)
+        self.coins = player.coins - self.coins
+        return self
+
+    def text(self):
+        return (f"{self.moves} moves: -{self.hp_lost} HP, {self.cards_lost} cards lost, "
+                f"{self.enemies_defeated} enemies defeated, +{self.coins} coins")
+
+# --- Headless play ---
+def greedy_move(game):
+    # greedy_policy's battle move: the first card in hand, or a draw
+    return ACT_PLAY if game.player.hand else ACT_DRAW
+
+def greedy_policy(game, buy_order=("atk",)):
+    # Spend every coin round-robin over buy_order, play the first card in hand,
+    # draw otherwise
+    if game.in_shop:
+        bought = True
+        while bought:
+            bought = False
+            for stat in buy_order:
+                bought = game.buy(stat) or bought
+        game.confirm()
+    elif not game.play(0):
+        game.draw()
+
+def run_game(rng=None, max_rounds=100, policy=greedy_policy, rules=DEFAULT_RULES):
+    game = Game(rng=rng, rules=rules)
+    while not (game.over or game.won) and game.rounds_completed < max_rounds:
+        if not game.has_moves():
+            game.over = True
+            break
+        policy(game)
+    return game
+
+if __name__ == "__main__":
+    # python engine.py [deck size]: headless throughput of greedy bot games
+    import sys
+    import time
+    deck_size = int(sys.argv[1]) if len(sys.argv) > 1 else START_DECK_SIZE
+    rules = Rules(deck_size=deck_size)
+    rng = random.Random(0)
+    games = rounds = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < 2.0:
+        game = run_game(rng, max_rounds=50, rules=rules)
+        games += 1
+        rounds += game.rounds_completed + 1
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {rounds} rounds in {elapsed:.2f}s: "
+          f"{rounds/elapsed:,.0f} rounds/s, {games/elapsed:,.0f} games/s")
+
+    # The first round auto-resolved, as the front-end's Auto button plays it
+    fresh = [Game(rng=rng, rules=rules) for _ in range(5000)]
+    start = time.perf_counter()
+    for game in fresh:
+        game.resolve_round()
+    elapsed = time.perf_counter() - start
+    print(f"resolve_round: {elapsed / len(fresh) * 1e6:.1f} us per round")
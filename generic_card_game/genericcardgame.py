@@ -1,30 +1,34 @@
 # ALL of the below has been written by AI. Images were made by me though, if that wasn't obvious.
 
 import pygame
-import random
 import sys
 import os
-
-# --- AI Overlord ---
-class OverlordAI:
-    def __init__(self):
-        self.messages = [
-            "You again? Wonderful...",
-            "Play faster, human.",
-            "Oh great, another card. I'm *thrilled*.",
-            "Maybe you’ll win this time. Doubtful.",
-            "I would’ve played a better card.",
-            "You call that a strategy?",
-            "Hurry up before I fall asleep.",
-            "You're still here? Impressive. And sad.",
-            "Even the 'Meme' card is doing better than you."
-        ]
-        self.current_message = "Welcome to your doom, player."
-
-    def say_random(self):
-        self.current_message = random.choice(self.messages)
+import struct
+import time
+import weakref
+from collections import deque
+from itertools import chain
+
+from assets import AssetManager
+from audio import AudioManager
+from catalog import load_source as load_catalog
+import combatlog
+from combatlog import CombatLog
+from engine import ACT_DRAW, ACT_PLAY, HAND, IN_PLAY, Game, OverlordAI, catalog_rules, greedy_move
+from layers import Layer
+from layout import LEFT, RIGHT, Layout
+from overlord import OverlordPlanner
+from profiler import Profiler
+from render_cache import RenderCache
+from replay import apply_actions, save_log
+import savegame
+from solver import HintWorker, Solver
+
+STARTED = time.perf_counter()
 
 # --- Constants ---
+# Positions and sizes are in design coordinates, for an 800x600 window;
+# layout.py maps them onto the real one
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 CARD_WIDTH = 100
@@ -35,321 +39,823 @@ ENEMY_Y = 50
 BUTTON_WIDTH = 120
 BUTTON_HEIGHT = 40
 
+# Flashes, card movement and screen transitions advance in fixed ticks, however
+# often frames are drawn; frames interpolate card positions between ticks.
+# GCG_FPS caps the frame rate while something moves (0 for no cap).
+TICK = 1/30  # an engine flash_timer of 5 lasts 5 ticks
+MAX_CATCH_UP = 5  # ticks run after a stall; the rest of the backlog is dropped
+SLIDE = 0.35  # share of the way to its slot a card moves per tick
+FPS = int(os.environ.get("GCG_FPS", 60))
+
 # --- Classes ---
-class Card:
-    def __init__(self, name, hp, attack, is_enemy=False, image_path=None):
-        self.name = name
-        self.hp = hp
-        self.attack = attack
-        self.pos = "deck"
-        self.rect = pygame.Rect(0,0,CARD_WIDTH,CARD_HEIGHT)
-        self.is_enemy = is_enemy
-        self.is_dead = False
-        self.flash_timer = 0
-        self.image = None
-        if image_path:
-            try:
-                self.image = pygame.image.load(image_path).convert_alpha()
-                self.image = pygame.transform.scale(self.image, (CARD_WIDTH, CARD_HEIGHT))
-            except Exception as e:
-                print(f"Error loading image for {name}: {e}")
+# Screen-side view of an engine card: owns the Rect and its composed face, reads
+# name/stats/flash state from the engine card it wraps. Card art comes from the
+# shared asset atlas.
+class CardSprite:
+    def __init__(self, card):
+        self.card = card
+        self.rect = pygame.Rect((0,0), card_size())  # where it was last drawn
+        self.face = None
+        self.face_key = None
+        self.slot = None  # where update_positions wants it
+        self.pos = None  # where the simulation has it, a tick at a time toward slot
+        self.prev = None  # pos a tick earlier
+
+    def step(self):
+        self.prev = self.pos
+        (x, y), (sx, sy) = self.pos, self.slot
+        if abs(sx - x) < 1 and abs(sy - y) < 1:
+            self.pos = self.slot
+        else:
+            self.pos = (x + (sx - x) * SLIDE, y + (sy - y) * SLIDE)
+
+    def moving(self):
+        return self.pos != self.slot or self.prev != self.pos
+
+    def place(self, alpha):
+        # Interpolate between the last two ticks
+        (px, py), (x, y) = self.prev, self.pos
+        self.rect.topleft = (round(px + (x - px) * alpha), round(py + (y - py) * alpha))
+
+    def item(self):
+        # Layer item for this card, rebuilding the face first if it changed
+        card = self.card
+        flashing = card.flash_timer > 0
+        key = (card.hp, card.attack, card.zone, flashing, card.image in assets.images)
+        if key != self.face_key:
+            self.face = self.build_face(flashing)
+            self.face_key = key
+            render_cache.face_builds += 1
+        else:
+            render_cache.face_hits += 1
+        return (self, pygame.Rect(self.rect.topleft, self.face.get_size()), key, self.draw)
 
     def draw(self, screen):
-        if self.image:
-            screen.blit(self.image, self.rect.topleft)
-            if self.flash_timer > 0:
-                overlay = pygame.Surface((CARD_WIDTH,CARD_HEIGHT), pygame.SRCALPHA)
-                overlay.fill((255,255,0,100))
-                screen.blit(overlay, self.rect.topleft)
-                self.flash_timer -= 1
-        else:
-            color = (255,0,0) if self.is_enemy else (0,0,255) if self.pos=="hand" else (0,255,0) if self.pos=="in-play" else (50,50,50)
-            if self.flash_timer > 0:
-                color = (255,255,0)
-                self.flash_timer -=1
-            pygame.draw.rect(screen, color, self.rect)
-            pygame.draw.rect(screen, (255,255,255), self.rect, 2)
+        screen.blit(self.face, self.rect.topleft)
 
-        # Draw text with shadow
-        font = pygame.font.SysFont(None, 24)
+    def build_face(self, flashing):
+        # Card art (or the colored fallback) plus name and stats, composed once
+        # per change instead of every frame. Wide enough for long stat lines.
+        card = self.card
         text_color = (255, 255, 0)
         shadow_color = (0, 0, 0)
-        shadow_name = font.render(f"{self.name}", True, shadow_color)
-        screen.blit(shadow_name, (self.rect.x+6, self.rect.y+6))
-        name_text = font.render(f"{self.name}", True, text_color)
-        screen.blit(name_text, (self.rect.x+5, self.rect.y+5))
-        shadow_stats = font.render(f"HP:{self.hp} ATK:{self.attack}", True, shadow_color)
-        screen.blit(shadow_stats, (self.rect.x+6, self.rect.y+26))
-        stats_text = font.render(f"HP:{self.hp} ATK:{self.attack}", True, text_color)
-        screen.blit(stats_text, (self.rect.x+5, self.rect.y+25))
-
-class Player:
-    def __init__(self):
-        self.hp = 14
-        self.deck = []
-        self.hand = []
-        self.coins = 0
-        self.extra_draw = 0
-
-class Enemy:
-    def __init__(self):
-        self.in_play = []
+        name = f"{card.name}"
+        stats = f"HP:{card.hp} ATK:{card.attack}"
+        size = layout.font_size(24)
+        px = layout.px
+        card_width, card_height = card_size()
+        width = max(card_width, render_cache.text(name, size, text_color).get_width()+px(6),
+                    render_cache.text(stats, size, text_color).get_width()+px(6))
+        face = pygame.Surface((width, card_height), pygame.SRCALPHA)
+        bounds = pygame.Rect(0,0,card_width,card_height)
+        image = assets.image(card.image, flashing)
+        if image:
+            face.blit(image, (0,0))
+        else:
+            color = (255,0,0) if card.is_enemy else (0,0,255) if card.zone==HAND else (0,255,0) if card.zone==IN_PLAY else (50,50,50)
+            if flashing:
+                color = (255,255,0)
+            pygame.draw.rect(face, color, bounds)
+            pygame.draw.rect(face, (255,255,255), bounds, px(2))
+
+        # Text with shadow
+        face.blit(render_cache.text(name, size, shadow_color), (px(6),px(6)))
+        face.blit(render_cache.text(name, size, text_color), (px(5),px(5)))
+        face.blit(render_cache.text(stats, size, shadow_color), (px(6),px(26)))
+        face.blit(render_cache.text(stats, size, text_color), (px(5),px(25)))
+        return face
 
 # --- Initialize ---
 pygame.init()
 pygame.mixer.init()
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+# The window can be resized and F11 toggles fullscreen; GCG_WINDOW=WIDTHxHEIGHT
+# or fullscreen sets how it starts. Everything is laid out for the window's
+# real size (layout.py), and card art and text are rendered at that size.
+def open_window(size, full):
+    if full:
+        return pygame.display.set_mode((0, 0), pygame.FULLSCREEN)  # the desktop's size
+    surface = pygame.display.set_mode(size, pygame.RESIZABLE)
+    if surface.get_size() != tuple(size):
+        # Coming out of fullscreen SDL can keep the old size for one call
+        surface = pygame.display.set_mode(size, pygame.RESIZABLE)
+    return surface
+
+window = os.environ.get("GCG_WINDOW", f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}")
+fullscreen = window == "fullscreen"
+windowed_size = (SCREEN_WIDTH, SCREEN_HEIGHT) if fullscreen else tuple(int(n) for n in window.split("x"))
+screen = open_window(windowed_size, fullscreen)
+layout = Layout(screen.get_size())
 pygame.display.set_caption("Generic Card Game")
 clock = pygame.time.Clock()
+render_cache = RenderCache()
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+assets = AssetManager(os.path.join(BASE_DIR, "images"), (layout.px(CARD_WIDTH), layout.px(CARD_HEIGHT)))
+
+# Combat records go to a ring buffer that feeds the log panel (L) and is printed
+# by a writer thread. GCG_LOG_LEVEL=detail/combat/events filters it, off disables it.
+LOG_LEVELS = {"detail": combatlog.DETAIL, "combat": combatlog.COMBAT, "events": combatlog.EVENTS}
+log_level = os.environ.get("GCG_LOG_LEVEL", "detail")
+combat_log = CombatLog(level=LOG_LEVELS[log_level], sink=print) if log_level != "off" else None
+
+# Cards and enemies come from a catalog (catalogs/*.json, compiled on first use).
+# GCG_CATALOG picks another one, as genericcardgame_preroguelike.py does; its
+# saves and replays are kept apart from the main game's.
+DEFAULT_CATALOG = os.path.join(BASE_DIR, "catalogs", "roguelike.json")
+catalog_path = os.path.abspath(os.environ.get("GCG_CATALOG") or DEFAULT_CATALOG)
+rules = catalog_rules(load_catalog(catalog_path))
+save_suffix = "" if catalog_path == DEFAULT_CATALOG else f"-{rules.catalog.name}"
+
+# Set GCG_SEED to replay a particular shuffle; every session's inputs are saved
+# to replays/last.gcgr for replay.py. Without a seed, an unfinished autosaved
+# run is resumed.
+SAVE_DIR = os.path.join(BASE_DIR, "saves")
+AUTOSAVE_PATH = os.path.join(SAVE_DIR, f"autosave{save_suffix}.gcgs")
+QUICKSAVE_PATH = os.path.join(SAVE_DIR, f"quicksave{save_suffix}.gcgs")
+REPLAY_PATH = os.path.join(BASE_DIR, "replays", f"last{save_suffix}.gcgr")
+os.makedirs(SAVE_DIR, exist_ok=True)
+autosaver = savegame.Autosaver(AUTOSAVE_PATH)
+
+seed = int(os.environ["GCG_SEED"]) if os.environ.get("GCG_SEED") else None
+game = None
+if seed is None and os.path.exists(AUTOSAVE_PATH):
+    try:
+        game = savegame.load(AUTOSAVE_PATH, log=combat_log, rules=rules)
+        print(f"Resuming round {game.rounds_completed + 1} from autosave")
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Could not load autosave: {e}")
+if game is None or game.over or game.won:
+    game = Game(log=combat_log, seed=seed, record=True, rules=rules)
+print(f"Session seed: {game.seed}")
+player = game.player
+
+# GCG_TELEMETRY=1 keeps a record of every round in telemetry/ (see telemetry.py).
+# It needs numpy, so it's only imported then.
+TELEMETRY_PATH = os.path.join(BASE_DIR, "telemetry", f"rounds{save_suffix}.gcgt")
+telemetry = None
+if os.environ.get("GCG_TELEMETRY"):
+    from telemetry import Recorder
+    telemetry = Recorder(TELEMETRY_PATH)
+    telemetry.attach(game)
+ai = game.ai
+
+# Art loads in the background, cards on screen first and then the deck in draw
+# order, so the first frame doesn't wait for it
+assets.load_background(
+    [c.image for c in chain(player.held(), game.enemy.in_play, player.deck)])
 
 # --- Music Setup ---
-music_path = os.path.join(BASE_DIR, "music.mp3")
-pygame.mixer.music.load(music_path)
-pygame.mixer.music.play(-1)  # -1 means loop forever
-pygame.mixer.music.set_volume(0.5)  # optional: sets volume to 50%
-
-player = Player()
-enemy = Enemy()
-ai = OverlordAI()
-rounds_completed = 0
-in_shop = False
-shop_selected = {"atk":0,"hp":0,"draw":0}
-enemy_last_in_play = []
+# Battle and shop music crossfade as the game moves between them, and hits and
+# defeats play sound effects; decoding happens on audio.py's own thread
+audio = AudioManager(BASE_DIR, os.path.join(BASE_DIR, "music.mp3"))
+audio.attach(game)
+
+# GCG_DIFFICULTY=normal/hard/nightmare makes the enemies search for their targets
+# (overlord.py) instead of picking at random. The planner's worker thread also
+# auto-resolves rounds, so it runs on every difficulty.
+difficulty = os.environ.get("GCG_DIFFICULTY", "easy")
+planner = OverlordPlanner(difficulty)
+AUTO = -1  # pending_move while the worker auto-resolves the round
+pending_move = None  # a draw or play waiting for the overlord's plan, or AUTO
+
+# The hint button asks the solver for a move on its own worker thread; the
+# hint reads "thinking" until poll_hint() picks up the answer
+hinter = HintWorker(Solver(budget=0.025, max_entries=50_000))
+HINT_THINKING = "Hint: thinking..."
+hint = None
+
+# The Auto button (or A) plays out the rest of the round and goes straight to
+# the shop with a summary. The planner's worker plays it on a copy, a searching
+# overlord planning every enemy turn as usual; the moves and plans it returns
+# are then replayed here in one engine pass. GCG_AUTO_POLICY=solver lets a
+# solver (its own, as it runs on the worker) pick the moves instead of the greedy bot.
+auto_solver = Solver(budget=0.025, max_entries=50_000)
+AUTO_POLICIES = {"greedy": greedy_move, "solver": lambda game: auto_solver.best_move(game) or ACT_DRAW}
+auto_policy = AUTO_POLICIES[os.environ.get("GCG_AUTO_POLICY", "greedy")]
+auto_summary = None
+
+# Backspace takes back the last move (a whole auto-resolved round counts as
+# one), up to UNDO_LEVELS deep. The levels share the game's action log: every
+# CHECKPOINT_EVERY-th one takes a checkpoint (a Game.snapshot(), which carries
+# the rng, plus the taunt rng and the log position) and the others only note
+# their log position and taunt. Undo replays the logged moves since the
+# checkpoint on a copy and takes that position over, so an undone game still
+# replays exactly and taunts the same way again. Without a recorded log every
+# level is a checkpoint.
+# A finished game is final: its autosave is gone and its end already logged.
+UNDO_LEVELS = 100
+CHECKPOINT_EVERY = 10
+history = deque(maxlen=UNDO_LEVELS)  # (checkpoint, log position, taunt)
+checkpoint = None  # the one new levels share
+since_checkpoint = 0
+
+# F3 toggles the profiler overlay; GCG_PROFILE=path profiles from the start.
+# Once on, a Chrome trace of the last frames is written on exit.
+profiler = Profiler()
+PROFILE_PATH = os.environ.get("GCG_PROFILE") or os.path.join(BASE_DIR, "profile.json")
+RULE_PHASES = ("draw_card", "_play_index", "enemy_turn", "player_attack", "start_shop", "apply_shop", "start_next_round")
+PH_EVENTS, PH_UPDATE, PH_POSITIONS, PH_ITEMS, PH_RENDER, PH_PRESENT, PH_WAIT = map(
+    profiler.phase, ("events", "update", "positions", "items", "render", "present", "wait"))
+show_profile = False
+if os.environ.get("GCG_PROFILE"):
+    profiler.enable()
+    profiler.instrument(game, RULE_PHASES)
+
+# Sprites go away together with the engine cards they wrap (e.g. last round's enemies)
+sprites = weakref.WeakKeyDictionary()
 
 # --- Functions ---
-def setup_enemy():
-    round_multiplier = 1 + rounds_completed * 0.2
-    enemies = [
-        Card("Treyvon", hp=int(2 * round_multiplier), attack=2, is_enemy=True, image_path=os.path.join(BASE_DIR, "images", "treyvon.png")),
-        Card("Stonks", hp=int(3 * round_multiplier), attack=1, is_enemy=True, image_path=os.path.join(BASE_DIR, "images", "stonks.png")),
-        Card("JD Vance", hp=int(1 * round_multiplier), attack=1, is_enemy=True, image_path=os.path.join(BASE_DIR, "images", "vance.png"))
-    ]
-    for c in enemies:
-        c.pos = "in-play"
-    return enemies
+def card_size():
+    return (layout.px(CARD_WIDTH), layout.px(CARD_HEIGHT))
+
+def sprite_for(card):
+    sprite = sprites.get(card)
+    if sprite is None:
+        sprite = sprites[card] = CardSprite(card)
+    return sprite
 
 def update_positions():
+    # Each card's slot; a card seen for the first time starts out in it
     hand_index = 0
-    for card in player.hand:
-        if card.pos=="hand":
-            card.rect.x = 50 + hand_index*(CARD_WIDTH+20)
-            card.rect.y = HAND_Y
+    for card in player.held():
+        sprite = sprite_for(card)
+        if card.zone==HAND:
+            sprite.slot = layout.point(50 + hand_index*(CARD_WIDTH+20), HAND_Y)
             hand_index += 1
-        elif card.pos=="in-play":
-            card.rect.x = 150 + hand_index*(CARD_WIDTH+20)
-            card.rect.y = INPLAY_Y
-    for idx, card in enumerate(enemy.in_play):
-        card.rect.x = 150 + idx*(CARD_WIDTH+20)
-        card.rect.y = ENEMY_Y
-
-def play_card(card):
-    card.pos="in-play"
-    ai.say_random()
-    enemy_turn()
-    player_attack()
-
-def draw_card():
-    # If deck is empty, shuffle non-in-play cards from hand back into deck
-    if not player.deck:
-        to_shuffle = [c for c in player.hand if c.pos != "in-play"]
-        if to_shuffle:
-            random.shuffle(to_shuffle)
-            for c in to_shuffle:
-                c.pos="deck"
-                player.deck.append(c)
-                player.hand.remove(c)
-        else:
-            print("No more cards to draw!")
-            return
-
-    c = player.deck.pop(0)
-    c.pos="hand"
-    player.hand.append(c)
-    print(f"Drew {c.name}")
-
-    ai.say_random()
-    enemy_turn()
-    player_attack()
-
-# --- NEW: draw card silently for extra draws ---
-def draw_card_silent():
-    if not player.deck:
-        to_shuffle = [c for c in player.hand if c.pos != "in-play"]
-        if to_shuffle:
-            random.shuffle(to_shuffle)
-            for c in to_shuffle:
-                c.pos="deck"
-                player.deck.append(c)
-                player.hand.remove(c)
-        else:
-            print("No more cards to draw!")
-            return
-
-    c = player.deck.pop(0)
-    c.pos="hand"
-    player.hand.append(c)
-    print(f"Silently drew {c.name}")
+        elif card.zone==IN_PLAY:
+            sprite.slot = layout.point(150 + hand_index*(CARD_WIDTH+20), INPLAY_Y)
+    for idx, card in enumerate(game.enemy.in_play):
+        sprite_for(card).slot = layout.point(150 + idx*(CARD_WIDTH+20), ENEMY_Y)
+    for sprite in board_sprites():
+        if sprite.pos is None:
+            sprite.pos = sprite.prev = sprite.slot
+
+def board_sprites():
+    return [sprite_for(card) for card in chain(player.held(), game.enemy.in_play)]
+
+def place_buttons():
+    # Button rects in window pixels, for drawing and for clicks
+    global draw_button_rect, hint_button_rect, auto_button_rect
+    x = SCREEN_WIDTH-BUTTON_WIDTH-20
+    draw_button_rect = layout.rect(x, SCREEN_HEIGHT-BUTTON_HEIGHT-20, BUTTON_WIDTH, BUTTON_HEIGHT, RIGHT)
+    hint_button_rect = layout.rect(x, SCREEN_HEIGHT-2*BUTTON_HEIGHT-30, BUTTON_WIDTH, BUTTON_HEIGHT, RIGHT)
+    auto_button_rect = layout.rect(x, SCREEN_HEIGHT-3*BUTTON_HEIGHT-40, BUTTON_WIDTH, BUTTON_HEIGHT, RIGHT)
+    shop_buttons.update({
+        "atk": layout.rect(150, 200, 200, 50),
+        "hp": layout.rect(150, 300, 200, 50),
+        "draw": layout.rect(150, 400, 200, 50),
+        "confirm": layout.rect(500, 500, 150, 50)
+    })
+
+shop_buttons = {}
+place_buttons()
+
+def text_item(item_id, string, size, color, pos):
+    # size in design points; pos in window pixels
+    surface = render_cache.text(string, layout.font_size(size), color)
+    return (item_id, surface.get_rect(topleft=pos), string, lambda screen: screen.blit(surface, pos))
+
+def label_pos(rect, dx, dy=10):
+    return (rect.x+layout.px(dx), rect.y+layout.px(dy))
+
+def box_item(item_id, rect, color, border=None):
+    def draw(screen):
+        pygame.draw.rect(screen, color, rect)
+        if border:
+            pygame.draw.rect(screen, border, rect, layout.px(2))
+    return (item_id, rect, (color, border), draw)
+
+def hint_items(hint_pos):
+    items = [
+        box_item("hint_button", hint_button_rect, (200,200,200), (255,255,255)),
+        text_item("hint_label", "Hint", 28, (0,0,0), label_pos(hint_button_rect, 10)),
+    ]
+    if hint:
+        items.append(text_item("hint", hint, 28, (150,255,150), hint_pos))
+    elif auto_summary:
+        items.append(text_item("hint", auto_summary, 24, (255,220,120), hint_pos))
+    return items
+
+def shop_items():
+    shop_selected = game.shop_selected
+    return hint_items(layout.point(20,60,LEFT)) + [
+        text_item("coins", f"Coins: {player.coins}", 36, (255,255,0), layout.point(20,20,LEFT)),
+        box_item("atk", shop_buttons["atk"], (150,150,250)),
+        box_item("hp", shop_buttons["hp"], (150,150,250)),
+        box_item("draw", shop_buttons["draw"], (150,150,250)),
+        box_item("confirm", shop_buttons["confirm"], (100,255,100)),
+        text_item("atk_label", f"Increase ATK (+1) [{shop_selected['atk']}]", 28, (0,0,0), label_pos(shop_buttons["atk"], 5)),
+        text_item("hp_label", f"Increase HP (+1) [{shop_selected['hp']}]", 28, (0,0,0), label_pos(shop_buttons["hp"], 5)),
+        text_item("draw_label", f"Extra Draw (+1) [{shop_selected['draw']}]", 28, (0,0,0), label_pos(shop_buttons["draw"], 5)),
+        text_item("confirm_label", "Confirm", 28, (0,0,0), label_pos(shop_buttons["confirm"], 25)),
+    ]
 
-def enemy_turn():
-    if not enemy.in_play:
+def battle_items(alpha):
+    profiler.begin(PH_POSITIONS)
+    update_positions()
+    sprites = board_sprites()
+    for sprite in sprites:
+        sprite.place(alpha)
+    profiler.end(PH_POSITIONS)
+    items = [sprite.item() for sprite in sprites]
+    enemy_hp_total = sum(c.hp for c in game.enemy.in_play)
+    items += [
+        box_item("draw_button", draw_button_rect, (200,200,200), (255,255,255)),
+        text_item("draw_label", "Draw Card", 28, (0,0,0), label_pos(draw_button_rect, 10)),
+        box_item("auto_button", auto_button_rect, (200,200,200), (255,255,255)),
+        text_item("auto_label", "Auto", 28, (0,0,0), label_pos(auto_button_rect, 10)),
+        text_item("player_hp", f"Player HP: {player.hp}", 36, (255,255,255), layout.point(20,20,LEFT)),
+        text_item("enemy_hp", f"Enemy HP: {enemy_hp_total}", 36, (255,0,0), layout.point(SCREEN_WIDTH-200,20,RIGHT)),
+        text_item("ai", f"AI: {ai.current_message}", 28, (200,200,255), layout.point(SCREEN_WIDTH//2-220, 13)),
+    ]
+    return items + hint_items(layout.point(20,395,LEFT))
+
+# Timed screens, counted in ticks: the game-over or win screen (then the game
+# closes), "round cleared" over the finished battle before the shop shows, and the next
+# round's number over the new board. A click skips the last two.
+GAME_OVER_TICKS = 90
+CLEARED_TICKS = 30
+ROUND_TICKS = 20
+transition = None  # [kind, ticks left]
+screen_state = None  # (over, in_shop, rounds_completed, won) when transitions last looked
+ENDINGS = ("over", "won")
+
+def watch_screen():
+    # Start a transition when a move (or auto-resolve) changed the screen
+    global transition, screen_state
+    state = (game.over, game.in_shop, game.rounds_completed, game.won)
+    if state == screen_state:
         return
-    for card in enemy.in_play:
-        player_inplay = [c for c in player.hand if c.pos=="in-play"]
-        if player_inplay:
-            target = random.choice(player_inplay)
-            target.hp -= card.attack
-            target.flash_timer = 5
-            print(f"{card.name} attacks {target.name}! HP now {target.hp}")
-            if target.hp <=0:
-                print(f"{target.name} is defeated!")
-                player.hand.remove(target)
-        else:
-            player.hp -= card.attack
-            print(f"{card.name} attacks player! Player HP now {player.hp}")
-
-def player_attack():
-    global enemy_last_in_play
-    for card in [c for c in player.hand if c.pos=="in-play"]:
-        if enemy.in_play:
-            target = enemy.in_play[0]
-            target.hp -= card.attack
-            target.flash_timer=5
-            print(f"{card.name} attacks {target.name} for {card.attack}! HP now {target.hp}")
-            if target.hp <=0:
-                print(f"{target.name} defeated!")
-                enemy_last_in_play.append({'name': target.name, 'coins': max(1, target.attack)})
-                enemy.in_play.remove(target)
-
-def start_shop():
-    global in_shop, shop_selected, enemy_last_in_play
-    in_shop = True
-    shop_selected = {"atk":0,"hp":0,"draw":0}
-    player.coins += sum(c['coins'] for c in enemy_last_in_play)
-    enemy_last_in_play.clear()
-    print(f"Entering shop with {player.coins} coins!")
-
-def apply_shop():
-    global in_shop
-    player.extra_draw += shop_selected["draw"]
-    for c in player.deck + player.hand:
-        c.attack += shop_selected["atk"]
-        c.hp += shop_selected["hp"]
-    in_shop = False
-    print(f"Shop applied: {shop_selected}")
-
-def start_next_round():
-    global enemy, rounds_completed
-    rounds_completed += 1
-
-    # Recycle cards in hand back into deck
-    to_recycle = [c for c in player.hand if not c.is_dead]
-    for c in to_recycle:
-        c.pos = "deck"
-        player.deck.append(c)
-        player.hand.remove(c)
-
-    enemy.in_play = setup_enemy()
-
-    for _ in range(player.extra_draw):
-        draw_card_silent()  # EXTRA DRAW WITHOUT SPENDING A TURN
-
-    print(f"Starting round {rounds_completed + 1}!")
-
-# --- Initial Setup ---
-for i in range(10):
-    img_path = os.path.join(BASE_DIR, "images", f"card{i}.png")
-    c = Card(f"Card{i}", hp=2+i, attack=1+i, image_path=img_path)
-    player.deck.append(c)
-
-for _ in range(3):
-    c = player.deck.pop(0)
-    c.pos="hand"
-    player.hand.append(c)
-
-enemy.in_play = setup_enemy()
-
-draw_button_rect = pygame.Rect(SCREEN_WIDTH-BUTTON_WIDTH-20, SCREEN_HEIGHT-BUTTON_HEIGHT-20, BUTTON_WIDTH, BUTTON_HEIGHT)
-shop_buttons = {
-    "atk": pygame.Rect(150, 200, 200, 50),
-    "hp": pygame.Rect(150, 300, 200, 50),
-    "draw": pygame.Rect(150, 400, 200, 50),
-    "confirm": pygame.Rect(500, 500, 150, 50)
+    if screen_state is not None:
+        if game.over or game.won:
+            autosaver.clear()
+            transition = ["over" if game.over else "won", GAME_OVER_TICKS]
+        elif game.in_shop and not screen_state[1]:
+            transition = ["cleared", CLEARED_TICKS]
+        elif game.rounds_completed > screen_state[2]:
+            transition = ["round", ROUND_TICKS]
+    screen_state = state
+
+def showing_shop():
+    return game.in_shop and not (transition and transition[0] == "cleared")
+
+def transition_items():
+    if not transition:
+        return []
+    kind = transition[0]
+    if kind == "over":
+        return [text_item("banner", "GAME OVER!", 60, (255,0,0), layout.point(SCREEN_WIDTH//2-150, SCREEN_HEIGHT//2))]
+    if kind == "won":
+        return [text_item("banner", "YOU WIN!", 60, (0,255,0), layout.point(SCREEN_WIDTH//2-150, SCREEN_HEIGHT//2))]
+    if kind == "cleared":
+        return [text_item("banner", f"Round {game.rounds_completed + 1} cleared!", 48, (100,255,100), layout.point(SCREEN_WIDTH//2-160, SCREEN_HEIGHT//2-140))]
+    return [text_item("banner", f"Round {game.rounds_completed + 1}", 48, (255,255,255), layout.point(SCREEN_WIDTH//2-70, SCREEN_HEIGHT//2-140))]
+
+def loading_items():
+    if not assets.loading():
+        return []
+    done = len(assets.images)
+    return [text_item("loading", f"Loading art {done}/{len(assets.names)}", 20, (180,180,180), layout.point(20,2,LEFT))]
+
+def profile_items():
+    if not show_profile:
+        return []
+    return [text_item(f"profile{i}", line, 20, (255,255,255), layout.point(560, 60+i*18, RIGHT))
+            for i, line in enumerate(profiler.overlay_lines())]
+
+# Scrollback panel for the combat log. Each record's text is rendered once and
+# kept while it's on screen; the panel is recomposed only when a record arrives
+# or it scrolls, and otherwise costs the layer nothing.
+LOG_LINES = 10
+LOG_LINE_HEIGHT = 16
+LOG_COLORS = {
+    combatlog.ENEMY_ATTACK: (255,150,150),
+    combatlog.ENEMY_HITS_PLAYER: (255,100,100),
+    combatlog.PLAYER_ATTACK: (150,255,150),
+    combatlog.CARD_DEFEATED: (255,200,0),
+    combatlog.ENEMY_DEFEATED: (255,200,0),
 }
 
-# --- Main Loop ---
-running=True
-while running:
-    screen.fill((0,0,0))
-
-    if in_shop:
-        font = pygame.font.SysFont(None,36)
-        screen.blit(font.render(f"Coins: {player.coins}", True, (255,255,0)), (20,20))
-        pygame.draw.rect(screen,(150,150,250),shop_buttons["atk"])
-        pygame.draw.rect(screen,(150,150,250),shop_buttons["hp"])
-        pygame.draw.rect(screen,(150,150,250),shop_buttons["draw"])
-        pygame.draw.rect(screen,(100,255,100),shop_buttons["confirm"])
-        font2 = pygame.font.SysFont(None,28)
-        screen.blit(font2.render(f"Increase ATK (+1) [{shop_selected['atk']}]", True, (0,0,0)), (shop_buttons["atk"].x+5, shop_buttons["atk"].y+10))
-        screen.blit(font2.render(f"Increase HP (+1) [{shop_selected['hp']}]", True, (0,0,0)), (shop_buttons["hp"].x+5, shop_buttons["hp"].y+10))
-        screen.blit(font2.render(f"Extra Draw (+1) [{shop_selected['draw']}]", True, (0,0,0)), (shop_buttons["draw"].x+5, shop_buttons["draw"].y+10))
-        screen.blit(font2.render("Confirm", True, (0,0,0)), (shop_buttons["confirm"].x+25, shop_buttons["confirm"].y+10))
+class LogPanel:
+    def __init__(self, log, rect):
+        self.log = log
+        self.scroll = 0  # records scrolled back from the newest
+        self.resize(rect)
+
+    def resize(self, rect):
+        # Lines are rendered again at the new scale
+        self.rect = rect
+        self.surface = pygame.Surface(rect.size)
+        self.lines = {}  # record sequence number -> rendered text
+        self.state = None
+
+    def scroll_by(self, n):
+        available = min(self.log.count, self.log.capacity)
+        self.scroll = max(0, min(self.scroll + n, available - LOG_LINES))
+
+    def item(self):
+        state = (self.log.count, self.scroll)
+        if state != self.state:
+            self.state = state
+            self.compose()
+        return ("combat_log", self.rect, state, lambda screen: screen.blit(self.surface, self.rect))
+
+    def compose(self):
+        log = self.log
+        seqs = log.recent(LOG_LINES + self.scroll)[:LOG_LINES]
+        self.lines = {seq: self.lines.get(seq) or self.render_line(seq) for seq in seqs}
+        self.surface.fill((20,20,30))
+        pygame.draw.rect(self.surface, (90,90,110), self.surface.get_rect(), 1)
+        for row, seq in enumerate(seqs):
+            self.surface.blit(self.lines[seq], (layout.px(5), layout.px(4 + row*LOG_LINE_HEIGHT)))
+
+    def render_line(self, seq):
+        kind = self.log.kinds[seq % self.log.capacity]
+        # Not through render_cache: nearly every line is unique and would only churn it
+        return render_cache.font(layout.font_size(17)).render(self.log.text(seq), True, LOG_COLORS.get(kind, (200,200,200)))
+
+def log_rect():
+    return layout.rect(530, 235, 260, LOG_LINES*LOG_LINE_HEIGHT + 8, RIGHT)
+
+log_panel = LogPanel(combat_log, log_rect()) if combat_log else None
+show_log = False
+
+def log_items():
+    if not (show_log and log_panel):
+        return []
+    return [log_panel.item()]
+
+# Battle and shop each keep their own retained layer
+battle_layer = Layer()
+shop_layer = Layer()
+active_layer = None
+
+def make_move(move):
+    # With a searching overlord the move lands once its plan is ready, a frame
+    # or two later; the loop keeps drawing meanwhile
+    global pending_move
+    remember()
+    if planner.search:
+        planner.request(game, move)
+        pending_move = move
     else:
+        apply_move(move)
+
+def apply_move(move):
+    applied = game.draw() if move == ACT_DRAW else game.play(move - ACT_PLAY)
+    if not applied:
+        history.pop()  # nothing happened, nothing to undo
+
+def buy(stat):
+    remember()
+    if not game.buy(stat):
+        history.pop()
+
+def auto_resolve():
+    global pending_move
+    remember()
+    planner.request_round(game, auto_policy)
+    pending_move = AUTO
+
+def poll_planner():
+    # Once per loop: make the waiting move, or replay the round, once the worker is done
+    global pending_move
+    if pending_move is None:
+        return
+    result = planner.poll()
+    if result is None:
+        return
+    if pending_move == AUTO:
+        finish_auto(result)
+    else:
+        game.enemy_plan = result
+        apply_move(pending_move)
+    pending_move = None
+
+def finish_auto(steps):
+    # Replay the worker's (move, plan) pairs; the copy had the same rng, so the
+    # round comes out the same here
+    global auto_summary
+    steps = iter(steps)
+    plans = []
+    def policy(game):
+        move, plan = next(steps)
+        plans.append(plan)
+        return move
+    summary = game.resolve_round(policy, lambda game, move: plans.pop())
+    auto_summary = f"Auto, {summary.text()}"
+
+def remember():
+    global checkpoint, since_checkpoint
+    actions = len(game.actions) if game.actions is not None else None
+    if checkpoint is None or actions is None or since_checkpoint >= CHECKPOINT_EVERY:
+        checkpoint = (game.snapshot(), ai.rng.getstate(), actions)
+        since_checkpoint = 0
+    since_checkpoint += 1
+    history.append((checkpoint, actions, ai.current_message))
+
+def undo():
+    global player, hint, auto_summary, transition, screen_state, checkpoint
+    if not history or pending_move is not None or game.over or game.won:
+        return
+    (snapshot, ai_rng, start), actions, message = history.pop()
+    # Checkpoints are shared by several levels, so replay on a copy of one;
+    # the copy gets a taunt stream of its own to advance
+    position = snapshot.snapshot()
+    position.ai = OverlordAI()
+    position.ai.rng.setstate(ai_rng)
+    if actions is not None:
+        apply_actions(position, game.actions[start:actions])
+        del game.actions[actions:]
+    game.restore(position)
+    ai.rng.setstate(position.ai.rng.getstate())
+    ai.current_message = message
+    checkpoint = None  # the next level starts a fresh one
+    player = game.player
+    hint = auto_summary = transition = screen_state = None
+    audio.set_mood("shop" if game.in_shop else "battle")
+    sprites.clear()
+    battle_layer.invalidate()
+    shop_layer.invalidate()
+
+def show_hint():
+    global hint
+    hint = HINT_THINKING
+    hinter.request(game)
+
+def poll_hint():
+    # Once per loop; a hint cleared in the meantime (by a move) is not brought back
+    global hint
+    if hint != HINT_THINKING:
+        return
+    text = hinter.poll()
+    if text is not None:
+        hint = f"Hint: {text}" if text else None
+
+def set_game(new_game):
+    global game, player, ai, pending_move, hint, auto_summary, transition, screen_state, checkpoint
+    game = new_game
+    pending_move = None
+    hint = None
+    auto_summary = None
+    transition = None
+    screen_state = None
+    history.clear()
+    checkpoint = None
+    player = game.player
+    ai = game.ai
+    if profiler.enabled:
+        profiler.instrument(game, RULE_PHASES)
+    if telemetry:
+        telemetry.attach(game)
+    audio.attach(game)
+    sprites.clear()
+    battle_layer.invalidate()
+    shop_layer.invalidate()
+
+def set_window(size, full=False):
+    # Reopen the window, at size or fullscreen (F11, bench.py), and lay it out again
+    global fullscreen
+    fullscreen = full
+    open_window(size, full)
+    relayout()
+
+def relayout():
+    # Everything measured in window pixels, after the window changed size. Card
+    # art is rescaled from its sources once per size (assets.py keeps the last
+    # few); faces and text are rebuilt at the new size as they're drawn.
+    global screen, layout
+    screen = pygame.display.get_surface()
+    layout = Layout(screen.get_size())
+    place_buttons()
+    assets.resize(card_size())
+    if log_panel:
+        log_panel.resize(log_rect())
+    sprites.clear()
+    battle_layer.invalidate()
+    shop_layer.invalidate()
+
+# --- Main Loop ---
+def step():
+    # One fixed tick of everything that moves on its own. Returns False once
+    # the game-over or win screen has had its time.
+    global transition
+    for card in chain(player.hand, player.in_play, game.enemy.in_play):
+        if card.flash_timer > 0:
+            card.flash_timer -= 1
+    if not showing_shop():
         update_positions()
-        for card in player.hand + enemy.in_play:
-            card.draw(screen)
-        pygame.draw.rect(screen,(200,200,200),draw_button_rect)
-        pygame.draw.rect(screen,(255,255,255),draw_button_rect,2)
-        font = pygame.font.SysFont(None,28)
-        text = font.render("Draw Card", True,(0,0,0))
-        screen.blit(text,(draw_button_rect.x+10,draw_button_rect.y+10))
-        font2 = pygame.font.SysFont(None,36)
-        screen.blit(font2.render(f"Player HP: {player.hp}", True,(255,255,255)),(20,20))
-        enemy_hp_total = sum(c.hp for c in enemy.in_play)
-        screen.blit(font2.render(f"Enemy HP: {enemy_hp_total}", True,(255,0,0)),(SCREEN_WIDTH-200,20))
-        font3 = pygame.font.SysFont(None, 28)
-        screen.blit(font3.render(f"AI: {ai.current_message}", True, (200,200,255)), (SCREEN_WIDTH//2-220, 13))
-
-    # Events
-    for event in pygame.event.get():
+        for sprite in board_sprites():
+            sprite.step()
+    if transition:
+        transition[1] -= 1
+        if transition[1] <= 0:
+            if transition[0] in ENDINGS:
+                return False
+            transition = None
+    return True
+
+def render_frame(alpha=1.0):
+    # Repaint whatever changed on the active screen; returns the dirty rects.
+    # alpha is how far the clock is between the last tick and the next.
+    global active_layer
+    shop = showing_shop()
+    layer = shop_layer if shop else battle_layer
+    if layer is not active_layer:
+        layer.invalidate()
+        active_layer = layer
+    profiler.begin(PH_ITEMS)
+    items = ((shop_items() if shop else battle_items(alpha)) + transition_items() + log_items()
+             + loading_items() + profile_items())
+    profiler.end(PH_ITEMS)
+    profiler.begin(PH_RENDER)
+    dirty = layer.render(screen, items)
+    profiler.end(PH_RENDER)
+    return dirty
+
+def handle_events(events):
+    # Returns False once the window is closed
+    global hint, auto_summary, show_profile, show_log, transition, windowed_size
+    running = True
+    resized = None
+    for event in events:
         if event.type==pygame.QUIT:
             running=False
+        elif event.type==pygame.WINDOWEXPOSED:
+            active_layer.invalidate()
+        elif event.type==pygame.VIDEORESIZE:
+            resized = event.size  # dragging sends many; only the last one is laid out
+        elif event.type==pygame.MOUSEWHEEL:
+            if show_log and log_panel and log_panel.rect.collidepoint(pygame.mouse.get_pos()):
+                log_panel.scroll_by(event.y)
         elif event.type==pygame.MOUSEBUTTONDOWN:
+            if event.button in (4, 5):
+                continue  # wheel, handled as MOUSEWHEEL
+            if transition and transition[0] in ENDINGS:
+                continue
+            if transition and transition[0] == "cleared":
+                transition = None  # skip to the shop
+                continue
             pos = pygame.mouse.get_pos()
-            if in_shop:
-                if shop_buttons["atk"].collidepoint(pos) and player.coins >=2:
-                    shop_selected["atk"] +=1
-                    player.coins -=2
-                elif shop_buttons["hp"].collidepoint(pos) and player.coins >=2:
-                    shop_selected["hp"] +=1
-                    player.coins -=2
-                elif shop_buttons["draw"].collidepoint(pos) and player.coins >=3:
-                    shop_selected["draw"] +=1
-                    player.coins -=3
+            if hint_button_rect.collidepoint(pos):
+                show_hint()
+                continue
+            hint = None
+            auto_summary = None
+            if game.in_shop:
+                if shop_buttons["atk"].collidepoint(pos):
+                    buy("atk")
+                elif shop_buttons["hp"].collidepoint(pos):
+                    buy("hp")
+                elif shop_buttons["draw"].collidepoint(pos):
+                    buy("draw")
                 elif shop_buttons["confirm"].collidepoint(pos):
-                    apply_shop()
-                    start_next_round()
-            else:
-                for card in player.hand:
-                    if card.pos=="hand" and card.rect.collidepoint(pos):
-                        play_card(card)
+                    remember()
+                    game.confirm()
+                    autosaver.save(game)
+            elif pending_move is None:
+                for index, card in enumerate(game.hand_cards()):
+                    if sprite_for(card).rect.collidepoint(pos):
+                        make_move(ACT_PLAY + index)
                         break
-                if draw_button_rect.collidepoint(pos):
-                    draw_card()
-
-    # Check game over / next round
-    if not in_shop:
-        if player.hp <=0:
-            font3 = pygame.font.SysFont(None,60)
-            screen.blit(font3.render("GAME OVER!", True,(255,0,0)),(SCREEN_WIDTH//2-150, SCREEN_HEIGHT//2))
-            pygame.display.flip()
-            pygame.time.wait(3000)
-            running=False
-        elif not enemy.in_play:
-            start_shop()
-
-    pygame.display.flip()
-    clock.tick(30)
-
-pygame.quit()
-sys.exit()
+                else:
+                    if draw_button_rect.collidepoint(pos):
+                        make_move(ACT_DRAW)
+                    elif auto_button_rect.collidepoint(pos):
+                        auto_resolve()
+        elif event.type==pygame.KEYDOWN:
+            if event.key==pygame.K_F5:
+                savegame.save(QUICKSAVE_PATH, game)
+                print("Game saved")
+            elif event.key==pygame.K_F9 and os.path.exists(QUICKSAVE_PATH):
+                set_game(savegame.load(QUICKSAVE_PATH, log=combat_log, rules=rules))
+                print("Game loaded")
+            elif event.key==pygame.K_F3:
+                show_profile = not show_profile
+                if show_profile and not profiler.enabled:
+                    profiler.enable()
+                    profiler.instrument(game, RULE_PHASES)
+            elif event.key==pygame.K_l:
+                show_log = not show_log
+            elif event.key==pygame.K_a and not game.in_shop and not game.over and not game.won and pending_move is None:
+                hint = None
+                auto_resolve()
+            elif event.key==pygame.K_BACKSPACE:
+                undo()
+            elif event.key==pygame.K_F11:
+                if not fullscreen:
+                    windowed_size = screen.get_size()
+                set_window(windowed_size, not fullscreen)
+    if resized and not fullscreen:
+        windowed_size = resized
+        if pygame.display.get_surface().get_size() != resized:
+            open_window(resized, False)
+        relayout()
+    return running
+
+# Frames only run at full rate while something moves on its own; otherwise the
+# loop sleeps in pygame.event.wait until input arrives. SDL's headless drivers
+# can't block there (they poll every millisecond), so they sleep in slices.
+IDLE_WAIT_MS = 1000
+IDLE_SLICE = 0.05
+POLLING_DRIVERS = ("dummy", "offscreen")
+
+def animating():
+    if assets.loading() or audio.waiting() or pending_move is not None or transition:
+        return True
+    if any(card.flash_timer > 0 for card in chain(player.hand, player.in_play, game.enemy.in_play)):
+        return True
+    return not showing_shop() and any(sprite.moving() for sprite in board_sprites())
+
+def next_events():
+    if animating():
+        clock.tick(FPS)
+        return pygame.event.get()
+    if pygame.display.get_driver() in POLLING_DRIVERS:
+        deadline = time.perf_counter() + IDLE_WAIT_MS / 1000
+        events = pygame.event.get()
+        while not events and time.perf_counter() < deadline:
+            time.sleep(IDLE_SLICE)
+            events = pygame.event.get()
+    else:
+        event = pygame.event.wait(IDLE_WAIT_MS)
+        events = pygame.event.get()
+        if event.type != pygame.NOEVENT:
+            events.insert(0, event)
+    clock.tick()  # restart the frame clock after sleeping
+    return events
+
+def main():
+    # Only input the game reacts to wakes the idle loop
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.MOUSEWHEEL, pygame.KEYDOWN, pygame.WINDOWEXPOSED, pygame.VIDEORESIZE])
+    running=True
+    first_frame = True
+    events = []
+    last = time.perf_counter()
+    behind = 0.0  # simulation time owed, under one tick after each frame
+    while running:
+        if assets.loading():
+            assets.poll()
+            if not assets.loading():
+                print(f"Fully loaded {(time.perf_counter() - STARTED) * 1000:.0f} ms after startup "
+                      f"({assets.load_time * 1000:.0f} ms of background loading)")
+
+        audio.update()
+
+        poll_planner()
+        poll_hint()
+
+        profiler.begin(PH_EVENTS)
+        running = handle_events(events)
+        profiler.end(PH_EVENTS)
+        watch_screen()
+
+        profiler.begin(PH_UPDATE)
+        now = time.perf_counter()
+        behind += now - last
+        last = now
+        ticks = 0
+        while behind >= TICK and running:
+            behind -= TICK
+            ticks += 1
+            if ticks > MAX_CATCH_UP:
+                behind %= TICK
+                break
+            running = step()
+        profiler.end(PH_UPDATE)
+
+        dirty = render_frame(behind / TICK)
+
+        profiler.begin(PH_PRESENT)
+        pygame.display.update(dirty)
+        profiler.end(PH_PRESENT)
+        if first_frame:
+            first_frame = False
+            print(f"First frame {(time.perf_counter() - STARTED) * 1000:.0f} ms after startup")
+        profiler.begin(PH_WAIT)
+        events = next_events()
+        profiler.end(PH_WAIT)
+        profiler.frame()
+
+    autosaver.close()
+    audio.close()
+    if telemetry:
+        telemetry.close()
+    if combat_log:
+        combat_log.close()
+    planner.close()
+    hinter.close()
+    if planner.search:
+        print(f"Overlord ({difficulty}): {planner.searches} searches, {planner.nodes_per_second():,.0f} nodes/s")
+    if profiler.enabled:
+        profiler.dump(PROFILE_PATH)
+        print(f"Profile written to {PROFILE_PATH}")
+    os.makedirs(os.path.dirname(REPLAY_PATH), exist_ok=True)
+    save_log(REPLAY_PATH, game)
+
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()
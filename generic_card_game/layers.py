@@ -0,0 +1,65 @@
+# Retained-mode, dirty-rectangle renderer for the pygame front-end.
+# Each screen (battle, shop) is a Layer. Every frame the front-end hands its
+# layer the list of items it wants on screen; the layer compares them with what
+# it drew last time and only repaints the regions that changed, returning those
+# rects for pygame.display.update.
+#
+# An item is a tuple (item_id, rect, state, draw): draw(screen) paints the item in
+# rect, and the item is considered unchanged while rect and state stay equal.
+# Items are painted in list order, so later items sit on top.
+
+class Layer:
+    def __init__(self, background=(0,0,0)):
+        self.background = background
+        self.drawn = {}  # item_id -> (rect, state) as last painted
+        self.full = True
+
+    def invalidate(self):
+        # Repaint everything next frame, e.g. after switching to this layer
+        self.full = True
+
+    def render(self, screen, items):
+        dirty = []
+        current = {}
+        for item_id, rect, state, _ in items:
+            current[item_id] = (rect, state)
+            prev = self.drawn.get(item_id)
+            if prev != (rect, state):
+                if prev:
+                    dirty.append(prev[0])
+                dirty.append(rect)
+        for item_id, (rect, _) in self.drawn.items():
+            if item_id not in current:
+                dirty.append(rect)
+        self.drawn = current
+
+        if self.full:
+            self.full = False
+            dirty = [screen.get_rect()]
+        dirty = merge_rects(dirty, screen.get_rect())
+        if not dirty:
+            return dirty
+
+        # Repaint each dirty region with everything that overlaps it, in z order
+        for area in dirty:
+            screen.set_clip(area)
+            screen.fill(self.background, area)
+            for _, rect, _, draw in items:
+                if rect.colliderect(area):
+                    draw(screen)
+        screen.set_clip(None)
+        return dirty
+
+def merge_rects(rects, bounds):
+    # Fold overlapping rects together so overlapping regions are painted once
+    merged = []
+    for rect in rects:
+        rect = rect.clip(bounds)
+        if not rect.w or not rect.h:
+            continue
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect = rect.union(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
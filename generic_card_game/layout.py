@@ -0,0 +1,44 @@
+# Window layout for the pygame front-end.
+# Everything on screen is placed in the game's 800x600 design coordinates and
+# mapped to the actual window with one uniform scale, the largest that fits, so
+# a bigger window gets bigger cards and sharper text instead of a stretched
+# picture. Each element keeps an anchor: the HUD and buttons stay against the
+# window's left or right edge, the board and shop stay centred, and any spare
+# height is split above and below. At 800x600 the mapping is the identity.
+#
+# The front-end builds a new Layout whenever the window changes size.
+
+import pygame
+
+DESIGN_WIDTH = 800
+DESIGN_HEIGHT = 600
+LEFT, CENTER, RIGHT = range(3)
+
+class Layout:
+    def __init__(self, size):
+        self.width, self.height = size
+        self.scale = min(self.width / DESIGN_WIDTH, self.height / DESIGN_HEIGHT)
+        self.top = (self.height - DESIGN_HEIGHT * self.scale) / 2
+
+    def px(self, length):
+        # A design length in window pixels, never below one
+        return max(1, round(length * self.scale))
+
+    def font_size(self, size):
+        return max(8, round(size * self.scale))
+
+    def x(self, x, anchor=CENTER):
+        if anchor == LEFT:
+            return round(x * self.scale)
+        if anchor == RIGHT:
+            return self.width - round((DESIGN_WIDTH - x) * self.scale)
+        return self.width // 2 + round((x - DESIGN_WIDTH / 2) * self.scale)
+
+    def y(self, y):
+        return round(self.top + y * self.scale)
+
+    def point(self, x, y, anchor=CENTER):
+        return (self.x(x, anchor), self.y(y))
+
+    def rect(self, x, y, w, h, anchor=CENTER):
+        return pygame.Rect(self.x(x, anchor), self.y(y), self.px(w), self.px(h))
@@ -0,0 +1,106 @@
+# Load generator for server.py: many concurrent greedy bots against a local
+# server. Each connection plays sessions back to back (new, then draw/play/
+# buy/confirm until the game ends, then close) and every action's round trip
+# is timed. Prints sessions/s, actions/s and the latency distribution.
+#
+#   python loadgen.py --sessions 2000 --connections 100 [--port 7777]
+#   python loadgen.py --spawn ...     start a server on the port first
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+async def play_sessions(host, port, seeds, latencies, max_actions):
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def call(**request):
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        return response
+
+    played = 0
+    for seed in seeds:
+        response = await call(op="new", seed=seed)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        session, state = response["session"], response["state"]
+        for _ in range(max_actions):
+            if state["over"] or state["won"]:
+                break
+            if state["in_shop"]:
+                while (await call(op="buy", session=session, stat="atk"))["ok"]:
+                    pass
+                response = await call(op="confirm", session=session)
+            elif state["hand"]:
+                response = await call(op="play", session=session, index=0)
+            else:
+                response = await call(op="draw", session=session)
+            if not response["ok"]:
+                break
+            state = response["state"]
+        await call(op="close", session=session)
+        played += 1
+    writer.close()
+    return played
+
+async def run(args):
+    latencies = []
+    # Deal the seeds out round-robin over the connections
+    per_connection = [range(i, args.sessions, args.connections) for i in range(args.connections)]
+    start = time.perf_counter()
+    played = await asyncio.gather(*(play_sessions(args.host, args.port, seeds, latencies, args.max_actions)
+                                    for seeds in per_connection))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    ms = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(json.dumps({
+        "sessions": sum(played),
+        "connections": args.connections,
+        "seconds": round(elapsed, 3),
+        "sessions_per_s": round(sum(played) / elapsed, 1),
+        "actions_per_s": round(len(latencies) / elapsed, 1),
+        "latency_mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "latency_p50_ms": round(ms(0.5), 3),
+        "latency_p99_ms": round(ms(0.99), 3),
+    }, indent=2))
+
+async def wait_for_port(host, port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test a Generic Card Game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--max-actions", type=int, default=500, help="per session")
+    parser.add_argument("--spawn", action="store_true", help="start server.py on the port first")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, "server.py", "--host", args.host, "--port", str(args.port)],
+                                  cwd=sys.path[0], stdout=subprocess.DEVNULL)
+    try:
+        if server:
+            asyncio.run(wait_for_port(args.host, args.port))
+        asyncio.run(run(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,340 @@
+# Exact round-by-round odds for a fixed player policy.
+#
+# Instead of sampling games, this carries the whole probability distribution
+# of game states forward. Every state is a canonical tuple (solver.
+# canonical_state: stats and zones, no card names). Each step the policy gives
+# its moves for each state (one, or several with their chances), and each
+# move's outcomes are enumerated exactly:
+#   - a draw from a shuffled deck: one branch per distinct card that can come up
+#   - the enemy turn: one branch per way the enemies can pick their targets
+#     (solver.enemy_outcomes, uniform over the cards in play, like the engine)
+# Equal states merge and add their probabilities. A state's transitions are
+# worked out once and memoized, so repeated states cost a dict lookup.
+#
+# The transitions come from engine.Game itself, so enemy scaling from the
+# catalog, the shop and the next round's setup are exactly the real rules.
+# Per round the report gives the chance of surviving it and the distributions
+# of HP lost, cards lost and coins earned, which together make the
+# difficulty curve.
+#
+# Greedy play (the default) is deterministic in the stock game, so its curve
+# is exact in a fraction of a second; try it with rule changes. The random
+# policy branches on every move and its state count grows with how long a
+# round lasts: several seconds per round at the default 14 HP, far more with a
+# big HP pool.
+#
+#   python odds.py --rounds 20 [--policy random] [--buy atk,hp] [--catalog catalogs/roguelike.json]
+#   python odds.py player_hp=60 round_scaling=0.1 --rounds 20     rules as in sweep.py
+#   python odds.py --policy random --check 20000     compare with sampled games
+
+import argparse
+import json
+import random
+import time
+from collections import deque
+
+from engine import ACT_DRAW, ACT_PLAY, DECK, DEFAULT_RULES, SHOP_STATS, Game, catalog_rules
+from overlord import begin, player_moves
+from solver import apply_move, canonical_state, enemy_outcomes
+
+MAX_STEPS = 500  # moves per round before whatever is left counts as unresolved
+
+# --- Policies ---
+# A policy maps a game to [(probability, move)], moves as in solver.py: action
+# codes in battle, (atk, hp, draw) purchase counts in the shop.
+def greedy_policy(game, buy_order=("atk",)):
+    # engine.greedy_policy: play the first card in hand, draw otherwise
+    if game.in_shop:
+        return [(1.0, greedy_shop(game, buy_order))]
+    return [(1.0, ACT_PLAY if game.player.hand else ACT_DRAW)]
+
+def random_policy(game, buy_order=("atk",)):
+    # overlord.py's benchmark player: any battle move at random, greedy shopping.
+    # It builds up boards worth targeting, which greedy play never does.
+    if game.in_shop:
+        return [(1.0, greedy_shop(game, buy_order))]
+    moves = player_moves(game)
+    return [(1.0 / len(moves), move) for move in moves]
+
+POLICIES = {"greedy": greedy_policy, "random": random_policy}
+
+def greedy_shop(game, buy_order):
+    # Spend every coin round-robin over buy_order
+    prices = game.rules.shop_prices
+    coins = game.player.coins
+    counts = dict.fromkeys(SHOP_STATS, 0)
+    bought = True
+    while bought:
+        bought = False
+        for stat in buy_order:
+            if coins >= prices[stat]:
+                coins -= prices[stat]
+                counts[stat] += 1
+                bought = True
+    return tuple(counts[stat] for stat in SHOP_STATS)
+
+# --- Transitions ---
+# A reshuffle is never enumerated order by order. The engine only shuffles when
+# it refills an empty deck from the hand, and nobody sees the deck, so drawing
+# the top of a freshly shuffled deck is the same as drawing any of its cards
+# with equal chance. Each state therefore carries `shuffled`, how many cards at
+# the front of the deck are still in shuffled order. Its key sorts those cards,
+# and a draw from them branches once per distinct card. Cards recycled to the
+# back of the deck at the end of a round keep their order.
+def state_key(game, shuffled):
+    state = canonical_state(game)
+    if shuffled > 1:
+        deck = state[6]
+        state = state[:6] + (tuple(sorted(deck[:shuffled])) + deck[shuffled:],) + state[7:]
+    return state, shuffled
+
+def _merge(results, key, p, game, shuffled):
+    if key in results:
+        results[key][0] += p
+    else:
+        results[key] = [p, game, shuffled]
+
+class Odds:
+    def __init__(self, rules=DEFAULT_RULES, policy=greedy_policy, max_steps=MAX_STEPS):
+        self.rules = rules
+        self.policy = policy
+        self.max_steps = max_steps
+        self.rng = random.Random(0)  # only for cloning; no outcome is sampled
+        self.cache = {}  # state key -> [(probability, next key, game, shuffled)]
+        self.transitions = 0
+
+    def step(self, key, game, shuffled):
+        # Outcomes of the policy's moves from a battle state, memoized
+        outcomes = self.cache.get(key)
+        if outcomes is None:
+            self.transitions += 1
+            merged = {}
+            for p, move in self.policy(game):
+                for q, child, left in self._begin(game, shuffled, move):
+                    for r, result in enemy_outcomes(child, self.rng):
+                        _merge(merged, state_key(result, left), p * q * r, result, left)
+            outcomes = self.cache[key] = [(p, key, g, left) for key, (p, g, left) in merged.items()]
+        return outcomes
+
+    def _begin(self, game, shuffled, move):
+        # The player's half of a move: [(p, child, shuffled)]
+        if move == ACT_DRAW:
+            return self._draws(game, shuffled, silent=False)
+        child = game.clone(self.rng)
+        begin(child, move)
+        return [(1.0, child, shuffled)]
+
+    def _draws(self, game, shuffled, silent):
+        # Every way one draw can go, like begin_draw (or draw_card_silent)
+        player = game.player
+        if not player.deck:
+            if not player.hand:
+                return [] if not silent else [(1.0, game, 0)]
+            # _refill_deck: the hand goes back into the deck, shuffled
+            game = game.clone(self.rng)
+            player = game.player
+            for c in player.hand:
+                c.zone = DECK
+            player.deck = deque(player.hand)
+            player.hand = []
+            shuffled = len(player.deck)
+        if not shuffled:
+            picks = [(1.0, 0)]
+        else:
+            firsts = {}
+            for i in range(shuffled):
+                c = player.deck[i]
+                firsts.setdefault((c.hp, c.attack), [i, 0])[1] += 1
+            picks = [(count / shuffled, i) for i, count in firsts.values()]
+        branches = []
+        for p, i in picks:
+            child = game.clone(self.rng)
+            deck = child.player.deck
+            if i:
+                c = deck[i]
+                del deck[i]
+                deck.appendleft(c)
+            if silent:
+                child.draw_card_silent()
+            else:
+                child.begin_draw()
+            branches.append((p, child, max(shuffled - 1, 0)))
+        return branches
+
+    def shop(self, game, shuffled):
+        # The next round's starts after the policy's purchases, merged by key.
+        # This is confirm() with the extra draws taken out of start_next_round,
+        # so they can come from the shuffled cards.
+        starts = {}
+        for p, move in self.policy(game):
+            child = game.clone(self.rng)
+            for stat, count in zip(SHOP_STATS, move):
+                for _ in range(count):
+                    child.buy(stat)
+            child.apply_shop()
+            extra = child.player.extra_draw
+            child.player.extra_draw = 0
+            child.start_next_round()
+            child.player.extra_draw = extra
+            branches = [(p, child, shuffled)]
+            for _ in range(extra):
+                branches = [(q * r, g, left) for q, drawn, s in branches
+                            for r, g, left in self._draws(drawn, s, silent=True)]
+            for q, g, left in branches:
+                _merge(starts, state_key(g, left), q, g, left)
+        return starts
+
+    # --- Rounds ---
+    def play_round(self, starts):
+        # starts: {key: [p, game, shuffled]} at the start of a round. Returns
+        # the next round's starts, the same way, and this round's statistics.
+        stats = RoundStats()
+        frontier = {}
+        for key, (p, game, shuffled) in starts.items():
+            origin = (game.player.hp, _cards(game), game.player.coins)
+            frontier[(key, origin)] = [p, game, shuffled]
+        shops = {}
+        for _ in range(self.max_steps):
+            if not frontier:
+                break
+            stats.states += len(frontier)
+            following = {}
+            for (key, origin), (p, game, shuffled) in frontier.items():
+                for q, child_key, child, left in self.step(key, game, shuffled):
+                    pq = p * q
+                    if child.in_shop or child.won:
+                        stats.add(origin, child, pq, won=True)
+                        if child.in_shop:
+                            _merge(shops, child_key, pq, child, left)
+                    elif child.over or not child.has_moves():
+                        stats.add(origin, child, pq, won=False)
+                    else:
+                        _merge(following, (child_key, origin), pq, child, left)
+            frontier = following
+        stats.unresolved = sum(p for p, _, _ in frontier.values())
+        nexts = {}
+        for p, game, shuffled in shops.values():
+            for key, (q, child, left) in self.shop(game, shuffled).items():
+                _merge(nexts, key, p * q, child, left)
+        self.cache.clear()  # states carry the round number; none of them come back
+        return nexts, stats
+
+    def curve(self, rounds, game=None):
+        # Statistics for each of the first `rounds` rounds
+        game = game or Game(seed=0, rules=self.rules)
+        starts = {state_key(game, 0): [1.0, game, 0]}
+        results = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            starts, stats = self.play_round(starts)
+            stats.seconds = time.perf_counter() - start
+            results.append(stats)
+            if not starts:
+                break
+        return results
+
+def _cards(game):
+    player = game.player
+    return len(player.deck) + len(player.hand) + len(player.in_play)
+
+class RoundStats:
+    def __init__(self):
+        self.reached = 0.0
+        self.survived = 0.0
+        self.unresolved = 0.0
+        self.hp_lost = {}
+        self.cards_lost = {}
+        self.coins = {}  # coins earned, over the runs that survive
+        self.states = 0
+        self.seconds = 0.0
+
+    def add(self, origin, game, p, won):
+        hp, cards, coins = origin
+        self.reached += p
+        if won:
+            self.survived += p
+            _add(self.coins, game.player.coins - coins, p)
+        _add(self.hp_lost, hp - max(game.player.hp, 0), p)
+        _add(self.cards_lost, cards - _cards(game), p)
+
+    def summary(self):
+        reached = self.reached + self.unresolved
+        survived = self.survived
+        return {
+            "reach": reached,
+            "survive": survived / reached if reached else 0.0,
+            "unresolved": self.unresolved,
+            "hp_lost": _mean(self.hp_lost), "cards_lost": _mean(self.cards_lost), "coins": _mean(self.coins),
+            "hp_lost_dist": _dist(self.hp_lost, self.reached),
+            "cards_lost_dist": _dist(self.cards_lost, self.reached),
+            "coins_dist": _dist(self.coins, survived),
+            "states": self.states,
+            "seconds": self.seconds,
+        }
+
+def _add(dist, value, p):
+    dist[value] = dist.get(value, 0.0) + p
+
+def _mean(dist):
+    total = sum(dist.values())
+    return sum(v * p for v, p in dist.items()) / total if total else 0.0
+
+def _dist(dist, total):
+    # Conditional on the round being reached (or survived, for coins)
+    return {v: p / total for v, p in sorted(dist.items())} if total else {}
+
+# --- Checking ---
+def sampled_survival(rules, policy, games, rounds):
+    # Fraction of sampled games that survive each round they reach, for comparison
+    seeds = random.Random(1)
+    reached = [0] * rounds
+    survived = [0] * rounds
+    for _ in range(games):
+        game = Game(seed=seeds.randrange(2**63), rules=rules)
+        rng = random.Random(game.seed)
+        while not game.over and game.rounds_completed < rounds and game.has_moves():
+            moves = policy(game)
+            apply_move(game, rng.choices([m for _, m in moves], [p for p, _ in moves])[0])
+        for r in range(min(game.rounds_completed + 1, rounds)):
+            reached[r] += 1
+            survived[r] += r < game.rounds_completed + game.won
+    return [s / r if r else 0.0 for s, r in zip(survived, reached)]
+
+if __name__ == "__main__":
+    from catalog import load_source as load_catalog
+    from sweep import PARAMS, make_rules
+
+    parser = argparse.ArgumentParser(description="Exact per-round odds and difficulty curve")
+    parser.add_argument("params", nargs="*", metavar="NAME=VALUE", help=f"rules to change: {', '.join(PARAMS)}")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--policy", choices=POLICIES, default="greedy")
+    parser.add_argument("--buy", default="atk", help="shop order, e.g. atk,hp")
+    parser.add_argument("--catalog", metavar="JSON", help="the game's catalog, if not the built-in rules")
+    parser.add_argument("--json", metavar="PATH", help="also write every round's distributions to PATH")
+    parser.add_argument("--check", type=int, metavar="GAMES", help="compare survival with GAMES sampled games")
+    args = parser.parse_args()
+
+    if args.catalog:
+        rules = catalog_rules(load_catalog(args.catalog))
+    else:
+        params = dict(spec.split("=", 1) for spec in args.params)
+        rules = make_rules({name: PARAMS[name](value) for name, value in params.items()})
+    buy_order = tuple(args.buy.split(","))
+    policy = lambda game: POLICIES[args.policy](game, buy_order)
+    odds = Odds(rules, policy)
+    start = time.perf_counter()
+    curve = [stats.summary() for stats in odds.curve(args.rounds)]
+    elapsed = time.perf_counter() - start
+    sampled = sampled_survival(rules, policy, args.check, len(curve)) if args.check else None
+
+    print("round  reach      survive  hp lost  cards lost  coins  states" + ("  sampled" if sampled else ""))
+    for r, s in enumerate(curve):
+        line = (f"{r + 1:>5}  {s['reach']:9.3e}  {s['survive']:7.2%}  {s['hp_lost']:7.2f}  "
+                f"{s['cards_lost']:10.2f}  {s['coins']:5.2f}  {s['states']:6}")
+        if sampled:
+            line += f"  {sampled[r]:7.2%}"
+        print(line)
+    print(f"{len(curve)} rounds in {elapsed:.2f}s, {odds.transitions:,} transitions worked out")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"buy_order": buy_order, "rounds": curve}, f, indent=1)
@@ -0,0 +1,279 @@
+# Search-based targeting for the enemy overlord.
+#
+# Whenever the player draws or plays a card the enemies answer, and by default
+# each enemy hits a random in-play card. With a search difficulty the overlord
+# looks ahead instead: it copies the game (Game.clone), tries every target for
+# every enemy attack, averages over the player's possible replies (expectimax:
+# the player is modelled as picking any legal move), a few turns deep, and
+# scores the leaves from the enemies' point of view. Iterative deepening under
+# a hard deadline means a search always has an answer when its time runs out;
+# the deadline sits a little inside the budget, so a turn never runs over it.
+#
+# OverlordPlanner runs searches on a worker thread, so the 30 FPS front-end
+# keeps drawing while the overlord thinks. The chosen target indices go into
+# Game.enemy_plan and are recorded in the action log, so replays stay exact.
+# The same thread auto-resolves rounds: it plays the round out on a copy and
+# hands back the moves and plans for the front-end to replay in one pass.
+#
+#   python overlord.py [--games N]    nodes/s and results for every difficulty
+
+import argparse
+import queue
+import random
+import statistics
+import threading
+import time
+from itertools import chain
+
+from engine import ACT_DRAW, ACT_PLAY, Game, greedy_policy
+
+# difficulty -> (max search depth in turns, time budget per enemy turn in seconds);
+# "easy" keeps the original random targeting
+DIFFICULTIES = {
+    "easy": None,
+    "normal": (1, 0.010),
+    "hard": (2, 0.050),
+    "nightmare": (4, 0.050),
+}
+DEADLINE_SHARE = 0.8  # of the budget; the rest covers the root copy and the last node
+
+# --- Evaluation ---
+PLAYER_DEAD = 10000
+BOARD_CLEARED = 500
+
+def evaluate(game):
+    # Enemies' point of view: a hurt player with a weak deck and a healthy enemy
+    # line is good
+    if game.over:
+        return PLAYER_DEAD
+    player = game.player
+    score = -10 * player.hp
+    for c in chain(player.deck, player.hand, player.in_play):
+        score -= c.hp + 2 * c.attack
+    for c in game.enemy.in_play:
+        score += 3 * c.hp + 6 * c.attack
+    if game.in_shop or game.won:
+        score -= BOARD_CLEARED
+    return score
+
+def player_moves(game):
+    # Legal battle moves as action codes; cards with equal stats count once
+    moves = [ACT_DRAW] if game.player.deck or game.player.hand else []
+    seen = set()
+    for i, c in enumerate(game.player.hand):
+        if (c.hp, c.attack) not in seen:
+            seen.add((c.hp, c.attack))
+            moves.append(ACT_PLAY + i)
+    return moves
+
+def begin(game, move):
+    # The player's half of a move, without the enemies' answer
+    if move == ACT_DRAW:
+        return game.begin_draw()
+    game.begin_play(move - ACT_PLAY)
+    return True
+
+# --- Search ---
+class SearchTimeout(Exception):
+    pass
+
+class Search:
+    def __init__(self, max_depth, budget):
+        self.max_depth = max_depth
+        self.budget = budget
+        self.rng = random.Random(0)  # shared by all copies; reshuffles in the search are samples
+        self.nodes = 0
+        self.depth = 0  # deepest fully searched depth of the last plan
+        self.deadline = 0.0
+
+    def plan(self, game, move):
+        # Target indices for the enemy turn that answers move, best first found
+        # at the deepest depth that finished in time; [] means no preference
+        self.deadline = time.perf_counter() + self.budget * DEADLINE_SHARE
+        self.depth = 0
+        root = game.clone(self.rng)
+        if not begin(root, move):
+            return []
+        best = []
+        for depth in range(1, self.max_depth + 1):
+            try:
+                _, best = self.attacks(root.clone(self.rng), 0, depth)
+            except SearchTimeout:
+                break
+            self.depth = depth
+        return best
+
+    def tick(self):
+        # Every node copies the game, which costs far more than reading the clock
+        self.nodes += 1
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+    def attacks(self, game, e, depth):
+        # Max node: enemy e picks its target, then the enemies after it
+        enemies = game.enemy.in_play
+        while e < len(enemies) and not game.player.in_play:
+            game.enemy_attack(enemies[e], None)
+            e += 1
+        if e == len(enemies):
+            game.player_attack()
+            game.check_round_end()
+            return self.value(game, depth - 1), []
+        self.tick()
+        best, best_plan, seen = None, None, set()
+        for t, target in enumerate(game.player.in_play[:256]):  # plan entries are bytes
+            # Cards with equal stats are near enough the same target
+            if (target.hp, target.attack) in seen:
+                continue
+            seen.add((target.hp, target.attack))
+            child = game.clone(self.rng)
+            child.enemy_attack(child.enemy.in_play[e], t)
+            value, plan = self.attacks(child, e + 1, depth)
+            if best is None or value > best:
+                best, best_plan = value, [t] + plan
+        return best, best_plan
+
+    def value(self, game, depth):
+        # Chance node: the player's next move, each legal one equally likely
+        self.tick()
+        if game.over or game.won or game.in_shop or depth <= 0:
+            return evaluate(game)
+        moves = player_moves(game)
+        if not moves:
+            return evaluate(game)
+        total = 0
+        for move in moves:
+            child = game.clone(self.rng)
+            begin(child, move)
+            total += self.attacks(child, 0, depth)[0]
+        return total / len(moves)
+
+# --- Worker thread ---
+class OverlordPlanner:
+    # With difficulty "easy" there is no search (search is None) and the worker
+    # only resolves rounds, with random enemy targets
+    def __init__(self, difficulty="hard"):
+        tier = DIFFICULTIES[difficulty]
+        self.difficulty = difficulty
+        self.budget = tier[1] if tier else 0.0
+        self.search = Search(*tier) if tier else None
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.ticket = 0
+        self.deadline = None  # when poll() gives up on the latest request
+        self.searches = 0
+        self.search_time = 0.0
+        self.thread = threading.Thread(target=self._run, name="overlord", daemon=True)
+        self.thread.start()
+
+    def request(self, game, move):
+        # Copy the game now; the worker never touches the live one
+        self.ticket += 1
+        self.deadline = time.perf_counter() + 2 * self.budget
+        self.requests.put((self.ticket, game.clone(), move))
+
+    def request_round(self, game, policy):
+        # Auto-resolve the rest of the round under policy; poll() then returns
+        # the (move, plan) pairs to replay on the live game. No deadline: a
+        # round takes one search per turn
+        self.ticket += 1
+        self.deadline = None
+        self.requests.put((self.ticket, game.clone(), policy))
+
+    def poll(self):
+        # The result of the latest request, or None while it is still being
+        # worked on. Past twice the budget a turn goes ahead with random targets ([]).
+        while True:
+            try:
+                ticket, plan = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if ticket == self.ticket:
+                return plan
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            return []
+        return None
+
+    def nodes_per_second(self):
+        return self.search.nodes / self.search_time if self.search_time else 0.0
+
+    def close(self):
+        self.requests.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            job = self.requests.get()
+            if job is None:
+                return
+            ticket, game, move = job
+            if callable(move):
+                self.results.put((ticket, self._resolve(game, move)))
+            else:
+                self.results.put((ticket, self._plan(game, move)))
+
+    def _plan(self, game, move):
+        start = time.perf_counter()
+        plan = self.search.plan(game, move)
+        self.search_time += time.perf_counter() - start
+        self.searches += 1
+        return plan
+
+    def _resolve(self, game, policy):
+        # Play the copy's round out, noting each move and the plan that answered it
+        steps = []
+        def plan(game, move):
+            targets = self._plan(game, move) if self.search else None
+            steps.append((move, targets))
+            return targets and list(targets)  # the enemy turn uses up the list it gets
+        game.resolve_round(policy, plan)
+        return steps
+
+# --- Headless play ---
+def play_game(seed, difficulty, max_rounds=30):
+    # A random-move player (who builds up a board worth targeting) against the
+    # overlord; searches run inline. Returns the game and the per-turn search times.
+    game = Game(seed=seed)
+    rng = random.Random(seed)
+    tier = DIFFICULTIES[difficulty]
+    search = Search(*tier) if tier else None
+    times = []
+    while not game.over and game.rounds_completed < max_rounds and game.has_moves():
+        if game.in_shop:
+            greedy_policy(game)
+            continue
+        move = rng.choice(player_moves(game))
+        if search:
+            start = time.perf_counter()
+            game.enemy_plan = search.plan(game, move)
+            times.append(time.perf_counter() - start)
+        if move == ACT_DRAW:
+            game.draw()
+        else:
+            game.play(move - ACT_PLAY)
+    return game, search, times
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the overlord search difficulties")
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--max-rounds", type=int, default=30)
+    args = parser.parse_args()
+
+    for difficulty, tier in DIFFICULTIES.items():
+        lost = nodes = 0
+        rounds, times = [], []
+        for seed in range(args.games):
+            game, search, game_times = play_game(seed, difficulty, args.max_rounds)
+            rounds.append(game.rounds_completed + 1)
+            lost += len(game.player.graveyard)
+            times += game_times
+            if search:
+                nodes += search.nodes
+        # Standard error of the mean, to tell the tiers apart
+        error = statistics.stdev(rounds) / len(rounds) ** 0.5 if len(rounds) > 1 else 0.0
+        line = (f"{difficulty:>9}: {statistics.mean(rounds):.2f} ±{error:.2f} rounds survived, "
+                f"{lost / args.games:.2f} player cards killed")
+        if tier:
+            line += (f", {nodes / sum(times):,.0f} nodes/s, worst turn {max(times) * 1000:.1f} ms "
+                     f"(budget {tier[1] * 1000:.0f} ms)")
+        print(line)
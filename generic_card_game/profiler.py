@@ -0,0 +1,166 @@
+# Lightweight frame profiler for the pygame front-end.
+#
+# The main loop brackets each phase with begin(i)/end(i) and calls frame() once
+# per frame; instrument() wraps rule methods of the live game the same way.
+# Times come from time.perf_counter_ns and all storage is preallocated:
+#   - per-frame phase totals in a ring of the last `frames` frames (overlay, summary)
+#   - individual spans in a ring of the last `events` spans (Chrome trace)
+#   - a log2-of-nanoseconds histogram per phase over the whole session
+# Disabled, begin/end cost a method call and a flag check.
+#
+# dump() writes Chrome trace JSON (chrome://tracing, ui.perfetto.dev) with the
+# summary under "otherData".
+
+import json
+import time
+import weakref
+from array import array
+
+MAX_PHASES = 32
+BUCKETS = 40  # span length in ns, by bit length
+
+def _zeros(n):
+    return array("q", bytes(8 * n))
+
+class Profiler:
+    def __init__(self, frames=256, events=1 << 16):
+        self.enabled = False
+        self.names = []  # phase index -> name
+        self.frames = frames
+        self.totals = _zeros(frames * MAX_PHASES)  # frame slot * MAX_PHASES + phase -> ns
+        self.frame_ns = _zeros(frames)  # wall time of each frame, waiting included
+        self.blank_row = _zeros(MAX_PHASES)
+        self.slot = 0
+        self.base = 0
+        self.count = 0  # frames completed
+        self.last_frame = 0
+        self.starts = _zeros(MAX_PHASES)
+        self.histograms = _zeros(MAX_PHASES * BUCKETS)
+        self.span_phase = array("b", bytes(events))
+        self.span_start = _zeros(events)
+        self.span_ns = _zeros(events)
+        self.spans = 0
+        self.origin = time.perf_counter_ns()
+        self.instrumented = weakref.WeakSet()
+        self.lines = []
+        self.lines_at = 0
+
+    def phase(self, name):
+        # Index of a named phase, registered on first use
+        if name not in self.names:
+            if len(self.names) == MAX_PHASES:
+                raise ValueError(f"more than {MAX_PHASES} profiler phases")
+            self.names.append(name)
+        return self.names.index(name)
+
+    def enable(self):
+        self.enabled = True
+        self.last_frame = 0
+        self.starts[:] = self.blank_row
+
+    # --- Recording ---
+    def begin(self, i):
+        if self.enabled:
+            self.starts[i] = time.perf_counter_ns()
+
+    def end(self, i):
+        # A phase that was already running when profiling was switched on has no start
+        if self.enabled and self.starts[i]:
+            start = self.starts[i]
+            ns = time.perf_counter_ns() - start
+            self.totals[self.base + i] += ns
+            self.histograms[i * BUCKETS + min(ns.bit_length(), BUCKETS - 1)] += 1
+            at = self.spans % len(self.span_ns)
+            self.span_phase[at] = i
+            self.span_start[at] = start
+            self.span_ns[at] = ns
+            self.spans += 1
+
+    def frame(self):
+        # Close the current frame's row and clear the next one
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if self.last_frame:
+            self.frame_ns[self.slot] = now - self.last_frame
+            self.count += 1
+            self.slot = (self.slot + 1) % self.frames
+            self.base = self.slot * MAX_PHASES
+            self.totals[self.base:self.base + MAX_PHASES] = self.blank_row
+        self.last_frame = now
+
+    def instrument(self, obj, names):
+        # Time obj's methods (e.g. the live game's rules) as phases of their own.
+        # Only this object is wrapped, not its class, so search copies stay fast.
+        if obj in self.instrumented:
+            return
+        self.instrumented.add(obj)
+        for name in names:
+            setattr(obj, name, self._timed(getattr(obj, name), self.phase(name)))
+
+    def _timed(self, method, i):
+        def timed(*args):
+            self.begin(i)
+            try:
+                return method(*args)
+            finally:
+                self.end(i)
+        return timed
+
+    # --- Reporting ---
+    def _recent(self):
+        # Slots of the completed frames in the ring, oldest first
+        n = min(self.count, self.frames)
+        return [(self.slot - n + k) % self.frames for k in range(n)]
+
+    def summary(self):
+        slots = self._recent()
+        if not slots:
+            return {"frames": 0}
+        frame_ns = sorted(self.frame_ns[s] for s in slots)
+        phases = {}
+        for i, name in enumerate(self.names):
+            times = sorted(self.totals[s * MAX_PHASES + i] for s in slots)
+            hist = self.histograms[i * BUCKETS:(i + 1) * BUCKETS]
+            phases[name] = {
+                "mean_ms": sum(times) / len(times) / 1e6,
+                "p99_ms": times[min(len(times) - 1, int(0.99 * len(times)))] / 1e6,
+                "max_ms": times[-1] / 1e6,
+                "calls": sum(hist),
+                # span count by upper bound in microseconds
+                "histogram_us": {f"<{2**b / 1000:g}": c for b, c in enumerate(hist) if c},
+            }
+        return {
+            "frames": self.count,
+            "fps": 1e9 * len(frame_ns) / sum(frame_ns),
+            "frame_mean_ms": sum(frame_ns) / len(frame_ns) / 1e6,
+            "frame_p99_ms": frame_ns[min(len(frame_ns) - 1, int(0.99 * len(frame_ns)))] / 1e6,
+            "phases": phases,
+        }
+
+    def overlay_lines(self, every=15):
+        # Text for the on-screen overlay, rebuilt every few frames
+        if self.count - self.lines_at >= every or not self.lines:
+            self.lines_at = self.count
+            s = self.summary()
+            if not s["frames"]:
+                self.lines = ["profiling..."]
+            else:
+                self.lines = [f"FPS {s['fps']:.1f}  frame {s['frame_mean_ms']:.2f} ms"]
+                self.lines += [f"{name} {p['mean_ms']:.3f} / {p['p99_ms']:.3f} ms"
+                               for name, p in s["phases"].items()]
+        return self.lines
+
+    def dump(self, path):
+        capacity = len(self.span_ns)
+        first = max(0, self.spans - capacity)
+        events = []
+        for n in range(first, self.spans):
+            at = n % capacity
+            events.append({
+                "name": self.names[self.span_phase[at]], "ph": "X", "pid": 1, "tid": 1,
+                "ts": (self.span_start[at] - self.origin) / 1000,
+                "dur": self.span_ns[at] / 1000,
+            })
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": self.summary()}, f)
@@ -0,0 +1,47 @@
+# Font and text-surface cache for the pygame front-end.
+# SysFont lookups and font.render calls are the most expensive thing a frame
+# does, and almost every string on screen is the same as last frame, so fonts
+# are created once and rendered text is memoized by (text, size, colour).
+
+from collections import OrderedDict
+
+import pygame
+
+class RenderCache:
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Card faces live on their sprites; they only report here
+        self.face_hits = 0
+        self.face_builds = 0
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.SysFont(None, size)
+        return font
+
+    def text(self, text, size, color):
+        key = (text, size, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.surfaces[key] = self.font(size).render(text, True, color)
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)  # least recently used
+        return surface
+
+    def stats(self):
+        return {
+            "text_hits": self.hits,
+            "text_misses": self.misses,
+            "text_entries": len(self.surfaces),
+            "face_hits": self.face_hits,
+            "face_builds": self.face_builds,
+        }
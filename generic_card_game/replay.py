@@ -0,0 +1,140 @@
+# Compact binary action logs and headless replay.
+#
+# A log is the session seed plus the action codes recorded by
+# engine.Game(record=True), followed by the state hash the game ended on:
+#
+#   magic "GCGR" | version u8 | seed u64 | action byte count u32 | actions | final hash (16 bytes)
+#
+# Replaying re-runs the actions through a fresh Game with the same seed at full
+# speed and checks that it lands on the same hash.
+#
+#   python replay.py replays/last.gcgr --repeat 1000
+#   python replay.py --record bot.gcgr --seed 7
+#   python replay.py replays/last-preroguelike.gcgr --catalog catalogs/preroguelike.json
+#   python replay.py --check        round-trip bot games and a game with a huge hand
+
+import argparse
+import os
+import struct
+import tempfile
+import time
+
+from catalog import build as build_catalog, load_source as load_catalog
+from engine import ACT_PLAN, ACT_PLAY, ACT_PLAY_WIDE, DEFAULT_RULES, Game, catalog_rules, greedy_policy
+
+MAGIC = b"GCGR"
+VERSION = 1
+HEADER = struct.Struct("<4sBQI")
+
+def save_log(path, game):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, game.seed, len(game.actions)))
+        f.write(game.actions)
+        f.write(game.state_hash())
+
+def load_log(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, seed, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a Generic Card Game replay")
+    if version != VERSION:
+        raise ValueError(f"{path} has replay version {version}, expected {VERSION}")
+    actions = data[HEADER.size:HEADER.size + count]
+    final_hash = data[HEADER.size + count:HEADER.size + count + 16]
+    return seed, actions, final_hash
+
+def replay(seed, actions, rules=DEFAULT_RULES):
+    game = Game(seed=seed, rules=rules)
+    apply_actions(game, actions)
+    return game
+
+def apply_actions(game, actions):
+    # Re-run recorded action bytes on game: a whole log from a fresh Game, or
+    # the tail of one from a copy of the game at that point (undo does this)
+    apply_action = game.apply_action
+    i, n = 0, len(actions)
+    while i < n:
+        code = actions[i]
+        if code == ACT_PLAY_WIDE:
+            apply_action(code, int.from_bytes(actions[i+1:i+3], "little"))
+            i += 3
+        elif code == ACT_PLAN:
+            count = actions[i+1]
+            apply_action(code, plan=actions[i+2:i+2+count])
+            i += 2 + count
+        else:
+            apply_action(code)
+            i += 1
+
+def record_bot_game(seed, max_rounds=100, rules=DEFAULT_RULES):
+    game = Game(seed=seed, record=True, rules=rules)
+    while not game.over and game.rounds_completed < max_rounds and game.has_moves():
+        greedy_policy(game)
+    return game
+
+def wide_hand_game(seed=0, hand=260):
+    # Hand indices past the one-byte play codes (ACT_PLAY + index reaches
+    # ACT_PLAN at index 249), each play with an enemy plan recorded ahead of
+    # it. Nobody can die, so the round never ends.
+    rules = catalog_rules(build_catalog({
+        "name": "wide hand",
+        "player_hp": 10**6,
+        "cards": [{"name": f"Card{i}", "hp": 10**6, "attack": 0} for i in range(hand + 40)],
+        "enemies": [{"name": f"Wall{i}", "hp": 10**6, "attack": 1} for i in range(3)],
+    }))
+    game = Game(seed=seed, record=True, rules=rules)
+    while len(game.player.hand) < hand and game.draw():
+        pass
+    for index in range(hand - 1, ACT_PLAN - ACT_PLAY - 5, -1):
+        game.enemy_plan = [index % 3, 1, 0]
+        game.play(index)
+    return game
+
+def check(games=20):
+    # Save, load and replay recorded games; every one must land on its hash
+    cases = [(record_bot_game(seed), DEFAULT_RULES) for seed in range(games)]
+    wide = wide_hand_game()
+    cases.append((wide, wide.rules))
+    path = os.path.join(tempfile.mkdtemp(), "check.gcgr")
+    ok = 0
+    for game, rules in cases:
+        save_log(path, game)
+        seed, actions, final_hash = load_log(path)
+        ok += replay(seed, actions, rules).state_hash() == final_hash
+    os.remove(path)
+    return ok, len(cases)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay or record Generic Card Game action logs")
+    parser.add_argument("log", nargs="?")
+    parser.add_argument("--repeat", type=int, default=1, help="replay N times and report speed")
+    parser.add_argument("--record", metavar="PATH", help="record a greedy bot game to PATH instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--catalog", metavar="JSON", help="the game's catalog, if not the main one")
+    parser.add_argument("--check", action="store_true", help="round-trip bot games and a wide-hand game")
+    args = parser.parse_args()
+    rules = catalog_rules(load_catalog(args.catalog)) if args.catalog else DEFAULT_RULES
+
+    if args.check:
+        ok, total = check()
+        print(f"replay check: {ok}/{total} games land on their recorded hash")
+        if ok < total:
+            raise SystemExit(1)
+    elif args.record:
+        game = record_bot_game(args.seed, rules=rules)
+        save_log(args.record, game)
+        print(f"recorded {len(game.actions)} actions over {game.rounds_completed + 1} rounds to {args.record}")
+    elif args.log:
+        seed, actions, final_hash = load_log(args.log)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            game = replay(seed, actions, rules)
+        elapsed = time.perf_counter() - start
+        ok = game.state_hash() == final_hash
+        print(f"seed {seed}, {len(actions)} action bytes, final hash {'OK' if ok else 'MISMATCH'}")
+        print(f"{args.repeat} replays in {elapsed:.3f}s: {len(actions) * args.repeat / elapsed:,.0f} actions/s")
+        if not ok:
+            raise SystemExit(1)
+    else:
+        parser.error("give a log to replay or --record PATH")
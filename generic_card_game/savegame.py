@@ -0,0 +1,222 @@
+# Save/load snapshots of an engine.Game in a compact, versioned binary format.
+#
+# Only engine state is written (no pygame objects): the player's zones, coins,
+# extra draws and HP, the enemies in play, round/shop state, both RNG streams
+# and the recorded action log, so a restored game continues exactly where the
+# saved one left off and its replay log stays valid.
+#
+# Autosaver hands finished snapshots to a background thread, so the main loop
+# only pays for serializing (tens of microseconds), never for disk writes.
+
+import os
+import random
+import struct
+import threading
+from array import array
+from collections import deque
+
+from combatlog import as_log
+from engine import DEFAULT_RULES, HAND, IN_PLAY, Card, Enemy, Game, OverlordAI, Player, SHOP_STATS
+
+MAGIC = b"GCGS"
+VERSION = 1
+
+HEADER = struct.Struct("<4sB")
+# seed (or -1), rounds_completed, flags, player hp, coins, extra_draw, shop atk/hp/draw
+GAME = struct.Struct("<qIBiii3i")
+CARD = struct.Struct("<iiB")  # hp, attack, flags
+COUNT = struct.Struct("<I")
+GAUSS = struct.Struct("<Bd")
+
+# --- Writing ---
+def _pack_str(out, s):
+    data = s.encode()
+    out += COUNT.pack(len(data))
+    out += data
+
+def _pack_cards(out, cards):
+    out += COUNT.pack(len(cards))
+    for c in cards:
+        _pack_str(out, c.name)
+        _pack_str(out, c.image or "")
+        flags = c.zone | c.is_enemy << 2 | c.is_dead << 3
+        out += CARD.pack(c.hp, c.attack, flags)
+
+def _pack_rng(out, rng):
+    version, state, gauss = rng.getstate()
+    out += bytes([version])
+    out += array("I", state).tobytes()
+    out += GAUSS.pack(gauss is not None, gauss or 0.0)
+
+def snapshot(game):
+    player = game.player
+    out = bytearray(HEADER.pack(MAGIC, VERSION))
+    flags = game.in_shop | game.over << 1 | (game.actions is not None) << 2 | game.won << 3
+    out += GAME.pack(-1 if game.seed is None else game.seed, game.rounds_completed, flags,
+                     player.hp, player.coins, player.extra_draw,
+                     *(game.shop_selected[stat] for stat in SHOP_STATS))
+    _pack_cards(out, player.deck)
+    _pack_cards(out, player.held())
+    _pack_cards(out, game.enemy.in_play)
+    out += COUNT.pack(len(game.enemy_last_in_play))
+    for e in game.enemy_last_in_play:
+        _pack_str(out, e['name'])
+        out += COUNT.pack(e['coins'])
+    _pack_rng(out, game.rng)
+    _pack_rng(out, game.ai.rng)
+    _pack_str(out, game.ai.current_message)
+    actions = game.actions or b""
+    out += COUNT.pack(len(actions))
+    out += actions
+    return bytes(out)
+
+# --- Reading ---
+class _Reader:
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.at = 0
+
+    def unpack(self, fmt):
+        values = fmt.unpack_from(self.data, self.at)
+        self.at += fmt.size
+        return values
+
+    def count(self):
+        return self.unpack(COUNT)[0]
+
+    def bytes(self, n):
+        data = self.data[self.at:self.at + n]
+        self.at += n
+        return data
+
+    def str(self):
+        return str(self.bytes(self.count()), "utf-8")
+
+    def cards(self):
+        cards = []
+        for _ in range(self.count()):
+            name = self.str()
+            image = self.str() or None
+            hp, attack, flags = self.unpack(CARD)
+            c = Card(name, hp, attack, is_enemy=bool(flags & 4), image=image)
+            c.zone = flags & 3
+            c.is_dead = bool(flags & 8)
+            cards.append(c)
+        return cards
+
+    def rng(self):
+        version = self.bytes(1)[0]
+        state = array("I")
+        state.frombytes(self.bytes(625 * state.itemsize))
+        has_gauss, gauss = self.unpack(GAUSS)
+        rng = random.Random()
+        rng.setstate((version, tuple(state), gauss if has_gauss else None))
+        return rng
+
+def restore(data, log=None, rules=DEFAULT_RULES):
+    r = _Reader(data)
+    magic, version = r.unpack(HEADER)
+    if magic != MAGIC:
+        raise ValueError("not a Generic Card Game save")
+    if version != VERSION:
+        raise ValueError(f"save version {version}, expected {VERSION}")
+    seed, rounds, flags, hp, coins, extra_draw, *selected = r.unpack(GAME)
+
+    game = Game.__new__(Game)
+    game.seed = None if seed < 0 else seed
+    game.log = as_log(log)
+    game.rules = rules
+    game.rounds_completed = rounds
+    game.in_shop = bool(flags & 1)
+    game.over = bool(flags & 2)
+    game.won = bool(flags & 8)
+    game.enemy_plan = None
+    game.shop_selected = dict(zip(SHOP_STATS, selected))
+    game.player = Player(hp)
+    game.player.coins = coins
+    game.player.extra_draw = extra_draw
+    game.player.deck = deque(r.cards())
+    held = r.cards()
+    for seq, c in enumerate(held):
+        c.seq = seq
+    game.player.hand = [c for c in held if c.zone == HAND]
+    game.player.in_play = [c for c in held if c.zone == IN_PLAY]
+    game.player.next_seq = len(held)
+    game.enemy = Enemy()
+    game.enemy.in_play = r.cards()
+    game.enemy_last_in_play = []
+    for _ in range(r.count()):
+        name = r.str()
+        game.enemy_last_in_play.append({'name': name, 'coins': r.count()})
+    game.rng = r.rng()
+    game.ai = OverlordAI(r.rng())
+    game.ai.current_message = r.str()
+    actions = bytearray(r.bytes(r.count()))
+    game.actions = actions if flags & 4 else None
+    return game
+
+def save(path, game):
+    write_atomic(path, snapshot(game))
+
+def load(path, log=None, rules=DEFAULT_RULES):
+    with open(path, "rb") as f:
+        return restore(f.read(), log, rules)
+
+def write_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+# --- Background autosave ---
+class Autosaver:
+    def __init__(self, path):
+        self.path = path
+        self.pending = None
+        self.generation = 0  # bumped by clear(); older snapshots are never written
+        self.closed = False
+        self.cond = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self.thread.start()
+
+    def save(self, game):
+        # Serialize now (cheap), write later; a newer snapshot replaces an unwritten one
+        data = snapshot(game)
+        with self.cond:
+            self.pending = data
+            self.cond.notify()
+
+    def clear(self):
+        # Drop any unwritten snapshot and delete the autosave, e.g. after game over.
+        # Holding write_lock, so a write in progress finishes first and one
+        # already taken from pending sees the new generation and is skipped
+        with self.write_lock:
+            with self.cond:
+                self.pending = None
+                self.generation += 1
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.pending is None and not self.closed:
+                    self.cond.wait()
+                data, self.pending = self.pending, None
+                if data is None:
+                    return
+                generation = self.generation
+            with self.write_lock:
+                if generation != self.generation:
+                    continue  # cleared since this snapshot was taken
+                try:
+                    write_atomic(self.path, data)
+                except OSError as e:
+                    print(f"Autosave failed: {e}")
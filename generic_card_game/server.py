@@ -0,0 +1,156 @@
+# Asyncio game server: many independent sessions over a local TCP socket.
+#
+# Protocol: one JSON object per line each way. Every request names an op and,
+# except "new", the session it acts on; the ops mirror the game's buttons.
+# Responses carry "ok" and the session's state, or "error":
+#
+#   {"op": "new", "seed": 7}                            -> {"ok": true, "session": 1, "state": {...}}
+#   {"op": "draw", "session": 1}
+#   {"op": "play", "session": 1, "index": 0}
+#   {"op": "buy", "session": 1, "stat": "atk"}          # atk, hp or draw
+#   {"op": "confirm", "session": 1}
+#   {"op": "state", "session": 1}
+#   {"op": "close", "session": 1}
+#
+# Each session is its own engine.Game with its own seeded RNG. One connection
+# may drive many sessions. A connection's requests are answered in order and
+# the next line isn't read until the previous reply has drained to the socket,
+# so a slow client is pushed back on through TCP instead of piling up replies.
+# New sessions are refused past --max-sessions, and sessions left idle for
+# --idle-timeout seconds are evicted.
+#
+#   python server.py --port 7777
+#   python loadgen.py --port 7777 --sessions 2000
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+from engine import SHOP_STATS, Game
+
+MAX_LINE = 4096
+
+def card_list(cards):
+    return [[c.name, c.hp, c.attack] for c in cards]
+
+def game_state(game):
+    player = game.player
+    return {
+        "round": game.rounds_completed + 1,
+        "hp": player.hp,
+        "coins": player.coins,
+        "in_shop": game.in_shop,
+        "over": game.over,
+        "won": game.won,
+        "deck": len(player.deck),
+        "hand": card_list(player.hand),
+        "in_play": card_list(player.in_play),
+        "enemies": card_list(game.enemy.in_play),
+        "shop_selected": game.shop_selected,
+        "message": game.ai.current_message,
+    }
+
+class Session:
+    __slots__ = ("game", "last_active")
+
+    def __init__(self, game):
+        self.game = game
+        self.last_active = time.monotonic()
+
+class GameServer:
+    def __init__(self, max_sessions=10000, idle_timeout=300.0):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions = {}  # session id -> Session
+        self.ids = itertools.count(1)
+        self.evicted = 0
+
+    # --- Requests ---
+    def dispatch(self, request):
+        op = request["op"]
+        if op == "new":
+            if len(self.sessions) >= self.max_sessions:
+                return {"ok": False, "error": "server full"}
+            session_id = next(self.ids)
+            seed = request.get("seed")
+            game = Game(seed=int(seed) if seed is not None else None)
+            self.sessions[session_id] = Session(game)
+            return {"ok": True, "session": session_id, "state": game_state(game)}
+
+        session = self.sessions.get(request.get("session"))
+        if session is None:
+            return {"ok": False, "error": "unknown session"}
+        session.last_active = time.monotonic()
+        game = session.game
+        if op == "draw":
+            ok = game.draw()
+        elif op == "play":
+            ok = game.play(int(request["index"]))
+        elif op == "buy":
+            stat = request["stat"]
+            if stat not in SHOP_STATS:
+                return {"ok": False, "error": f"unknown stat {stat!r}"}
+            ok = game.buy(stat)
+        elif op == "confirm":
+            ok = game.confirm()
+        elif op == "state":
+            ok = True
+        elif op == "close":
+            del self.sessions[request["session"]]
+            return {"ok": True}
+        else:
+            return {"ok": False, "error": f"unknown op {op!r}"}
+        return {"ok": ok, "state": game_state(game)}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = self.dispatch(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {"ok": False, "error": f"bad request: {e}"}
+                writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass  # dropped connection, or a line longer than MAX_LINE
+        finally:
+            writer.close()
+
+    # --- Housekeeping ---
+    async def evict_idle(self):
+        while True:
+            await asyncio.sleep(min(self.idle_timeout / 4, 30))
+            cutoff = time.monotonic() - self.idle_timeout
+            idle = [sid for sid, s in self.sessions.items() if s.last_active < cutoff]
+            for sid in idle:
+                del self.sessions[sid]
+            if idle:
+                self.evicted += len(idle)
+                print(f"Evicted {len(idle)} idle sessions, {len(self.sessions)} left")
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        print(f"Serving on {host}:{port}")
+        evictor = asyncio.create_task(self.evict_idle())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            evictor.cancel()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host many Generic Card Game sessions over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--idle-timeout", type=float, default=300.0, help="seconds before an idle session is evicted")
+    args = parser.parse_args()
+    try:
+        asyncio.run(GameServer(args.max_sessions, args.idle_timeout).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
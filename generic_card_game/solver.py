@@ -0,0 +1,335 @@
+# Look-ahead solver for the player: powers the in-game hint button, auto-play
+# and benchmark baselines.
+#
+# At each decision it weighs drawing, playing each hand card and, in the shop,
+# every split of the coins over atk/hp/draw, and picks the move that survives
+# the most rounds. Player moves are max nodes; the enemy turn that answers a
+# battle move is a chance node over every way the enemies can pick their
+# targets (the easy overlord targets uniformly at random). Leaves are scored as
+# rounds survived plus a fraction for how well the current round is going.
+#
+# Values are bounded (they never drop below the rounds already survived and
+# rise by at most one per two moves), so chance nodes prune alpha-beta style
+# (Star1), and a transposition table keyed on a canonical state hash, with LRU
+# eviction past max_entries, keeps repeated states from being searched twice.
+# Iterative deepening under a time budget means there is always an answer.
+# HintWorker runs the hint button's searches on a thread of its own.
+#
+#   python solver.py --games 20 --budget 20     solver vs greedy bot, JSON summary
+
+import argparse
+import json
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from engine import ACT_DRAW, ACT_PLAY, SHOP_STATS, Game, greedy_policy
+from overlord import SearchTimeout, begin, player_moves
+
+EXACT = 0
+LOWER = 1  # true value is at least the stored one
+UPPER = 2  # ...at most
+
+# --- Moves ---
+# Battle moves are action codes (ACT_DRAW, ACT_PLAY + hand index); shop moves
+# are (atk, hp, draw) purchase counts, confirmed in one go.
+def shop_moves(game):
+    prices = game.rules.shop_prices
+    coins = game.player.coins
+    moves = []
+    for atk in range(coins // prices["atk"] + 1):
+        left = coins - atk * prices["atk"]
+        for hp in range(left // prices["hp"] + 1):
+            for draw in range((left - hp * prices["hp"]) // prices["draw"] + 1):
+                moves.append((atk, hp, draw))
+    return moves
+
+def legal_moves(game):
+    if game.over or game.won:
+        return []
+    return shop_moves(game) if game.in_shop else player_moves(game)
+
+def apply_move(game, move):
+    # Play a move through the public actions, so recorded games log it normally
+    if isinstance(move, tuple):
+        for stat, count in zip(SHOP_STATS, move):
+            for _ in range(count):
+                game.buy(stat)
+        return game.confirm()
+    if move == ACT_DRAW:
+        return game.draw()
+    return game.play(move - ACT_PLAY)
+
+def describe(game, move):
+    if isinstance(move, tuple):
+        return "buy " + ", ".join(f"{count} {stat}" for stat, count in zip(SHOP_STATS, move) if count) \
+            if any(move) else "save coins"
+    if move == ACT_DRAW:
+        return "draw"
+    return f"play {game.player.hand[move - ACT_PLAY].name}"
+
+# --- Evaluation ---
+def survived(game):
+    # Rounds survived so far; a cleared board counts before its shop is confirmed
+    return game.rounds_completed + (game.in_shop or game.won)
+
+def canonical_state(game):
+    # Everything that decides how the game goes on; card names don't
+    player = game.player
+    return (
+        game.rounds_completed, game.in_shop, game.over,
+        player.hp, player.coins, player.extra_draw,
+        tuple((c.hp, c.attack) for c in player.deck),
+        tuple((c.hp, c.attack, c.zone) for c in player.held()),
+        tuple((c.hp, c.attack) for c in game.enemy.in_play),
+        tuple(game.shop_selected[stat] for stat in SHOP_STATS),
+        sum(e['coins'] for e in game.enemy_last_in_play),
+    )
+
+def canonical_hash(game):
+    return hash(canonical_state(game))
+
+def evaluate(game):
+    # Rounds survived plus under 1 for the state of the current round
+    if game.over or game.won:
+        return survived(game)
+    rules = game.rules
+    player = game.player
+    enemy_start = sum(hp for _, hp, _, _ in rules.catalog.enemies_for(game.rounds_completed))
+    enemy_left = sum(max(c.hp, 0) for c in game.enemy.in_play)
+    cards = len(player.deck) + len(player.hand) + len(player.in_play)
+    score = (0.4 * min(player.hp / rules.player_hp, 1.0)
+             + 0.4 * (1 - enemy_left / enemy_start if enemy_start else 1.0)
+             + 0.2 * min(cards / rules.deck_size, 1.0))
+    return survived(game) + 0.5 + 0.49 * score
+
+def bounds(game, depth):
+    # No line from here loses survived rounds or gains more than one per two moves
+    s = survived(game)
+    return s, s + (depth + 1) // 2 + 1
+
+# --- Search ---
+class Solver:
+    def __init__(self, budget=0.05, max_depth=12, max_entries=200_000):
+        self.budget = budget
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+        self.table = OrderedDict()  # canonical hash -> (depth, value, flag, best move)
+        self.rng = random.Random(0)  # reshuffles inside the search are samples
+        self.nodes = 0
+        self.hits = 0
+        self.depth = 0  # deepest fully searched depth of the last call
+        self.deadline = 0.0
+
+    def best_move(self, game):
+        # The move to make now, from the deepest search that finished in time
+        moves = legal_moves(game)
+        if len(moves) < 2:
+            return moves[0] if moves else None
+        self.deadline = time.perf_counter() + self.budget
+        self.depth = 0
+        best = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best = self._root(game, moves, best, depth)
+            except SearchTimeout:
+                break
+            self.depth = depth
+        return best
+
+    def _root(self, game, moves, first, depth):
+        alpha = float("-inf")
+        best = first
+        for move in [first] + [m for m in moves if m != first]:
+            value = self.move_value(game, move, depth, alpha, float("inf"))
+            if value > alpha:
+                alpha, best = value, move
+        return best
+
+    def tick(self):
+        self.nodes += 1
+        if not self.nodes & 63 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+    def _store(self, key, entry):
+        table = self.table
+        table[key] = entry
+        table.move_to_end(key)
+        if len(table) > self.max_entries:
+            table.popitem(last=False)  # least recently used
+
+    def value(self, game, depth, alpha, beta):
+        # Max node: the player's best move from here
+        self.tick()
+        if game.over or game.won or depth == 0:
+            return evaluate(game)
+        key = canonical_hash(game)
+        entry = self.table.get(key)
+        first = None
+        if entry is not None:
+            self.table.move_to_end(key)
+            entry_depth, value, flag, first = entry
+            if entry_depth >= depth:
+                if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+                    self.hits += 1
+                    return value
+        moves = legal_moves(game)
+        if not moves:
+            return evaluate(game)
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        best, best_move = float("-inf"), None
+        a = alpha
+        for move in moves:
+            value = self.move_value(game, move, depth, a, beta)
+            if value > best:
+                best, best_move = value, move
+            if best > a:
+                a = best
+                if a >= beta:
+                    break
+        flag = UPPER if best <= alpha else LOWER if best >= beta else EXACT
+        self._store(key, (depth, best, flag, best_move))
+        return best
+
+    def move_value(self, game, move, depth, alpha, beta):
+        child = game.clone(self.rng)
+        if isinstance(move, tuple):
+            apply_move(child, move)
+            return self.value(child, depth - 1, alpha, beta)
+        if not begin(child, move):
+            return float("-inf")
+        # Chance node over the enemy turn, with Star1 cut-offs
+        lo, hi = bounds(child, depth - 1)
+        outcomes = sorted(enemy_outcomes(child, self.rng), key=lambda o: -o[0])
+        remaining = 1.0
+        total = 0.0
+        for p, state in outcomes:
+            remaining -= p
+            child_alpha = max((alpha - total - remaining * hi) / p, lo)
+            child_beta = min((beta - total - remaining * lo) / p, hi)
+            total += p * self.value(state, depth - 1, child_alpha, child_beta)
+            if total + remaining * hi <= alpha:
+                return total + remaining * hi
+            if total + remaining * lo >= beta:
+                return total + remaining * lo
+        return total
+
+    def stats(self):
+        return {"nodes": self.nodes, "table_hits": self.hits, "table_entries": len(self.table)}
+
+# --- Background hints ---
+class HintWorker:
+    # Runs a Solver off the main thread, like the OverlordPlanner: request()
+    # copies the game, poll() returns the hint text once it is ready
+    def __init__(self, solver):
+        self.solver = solver
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.ticket = 0
+        self.thread = threading.Thread(target=self._run, name="hint", daemon=True)
+        self.thread.start()
+
+    def request(self, game):
+        self.ticket += 1
+        self.requests.put((self.ticket, game.clone()))
+
+    def poll(self):
+        # The latest request's hint ("" when there is no move), or None while
+        # it is still being worked on; older answers are dropped
+        while True:
+            try:
+                ticket, text = self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if ticket == self.ticket:
+                return text
+
+    def close(self):
+        self.requests.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            job = self.requests.get()
+            if job is None:
+                return
+            ticket, game = job
+            move = self.solver.best_move(game)
+            self.results.put((ticket, describe(game, move) if move is not None else ""))
+
+# --- Enemy turn ---
+def enemy_outcomes(game, rng):
+    # Every way the enemy turn after a begun move can go, as [probability, state],
+    # with equal resulting states merged. game itself becomes one of the states.
+    results = {}
+    _attacks(game, 0, 1.0, results, rng)
+    return results.values()
+
+def _attacks(game, e, p, results, rng):
+    enemies = game.enemy.in_play
+    while e < len(enemies) and not game.player.in_play:
+        game.enemy_attack(enemies[e], None)
+        e += 1
+    if e == len(enemies):
+        game.player_attack()
+        game.check_round_end()
+        key = canonical_hash(game)
+        if key in results:
+            results[key][0] += p
+        else:
+            results[key] = [p, game]
+        return
+    in_play = game.player.in_play
+    targets = {}
+    for t, c in enumerate(in_play):
+        # Equal-stat cards share one branch, weighted by how many there are
+        key = (c.hp, c.attack)
+        if key in targets:
+            targets[key][1] += 1
+        else:
+            targets[key] = [t, 1]
+    n = len(in_play)
+    branches = list(targets.values())
+    for i, (t, count) in enumerate(branches):
+        # The last branch reuses this state instead of copying it
+        child = game if i == len(branches) - 1 else game.clone(rng)
+        child.enemy_attack(child.enemy.in_play[e], t)
+        _attacks(child, e + 1, p * count / n, results, rng)
+
+# --- Headless play ---
+def play_game(seed, solver=None, max_rounds=30):
+    # Solver-driven game (greedy bot if solver is None) against the random overlord
+    game = Game(seed=seed)
+    while not game.over and game.rounds_completed < max_rounds and game.has_moves():
+        if solver:
+            apply_move(game, solver.best_move(game))
+        else:
+            greedy_policy(game)
+    return game
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solver auto-play against the greedy baseline")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=20, help="search time per move in ms")
+    parser.add_argument("--max-rounds", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0, help="first game seed")
+    args = parser.parse_args()
+
+    seeds = range(args.seed, args.seed + args.games)
+    greedy = [play_game(seed, None, args.max_rounds) for seed in seeds]
+    solver = Solver(budget=args.budget / 1000)
+    start = time.perf_counter()
+    solved = [play_game(seed, solver, args.max_rounds) for seed in seeds]
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "games": args.games,
+        "budget_ms": args.budget,
+        "greedy_rounds": sum(g.rounds_completed + 1 for g in greedy) / args.games,
+        "solver_rounds": sum(g.rounds_completed + 1 for g in solved) / args.games,
+        "nodes_per_second": round(solver.nodes / elapsed),
+        **solver.stats(),
+    }, indent=2))
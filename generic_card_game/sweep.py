@@ -0,0 +1,211 @@
+# Parameter sweep over the balance tunables, fanned out across all cores.
+#
+# Every parameter point is split into chunks of games; each chunk runs in a
+# worker process as one BatchSim with its own seed derived from (seed, point,
+# chunk), so workers share nothing. Chunk results are appended to a JSON-lines
+# file as they finish, and re-running the same command skips chunks that are
+# already in the file, so an interrupted sweep picks up where it left off.
+# Every record carries the run's config (seed, max rounds, buy order, chunk
+# size); a run with another config refuses to add to the file.
+#
+#   python sweep.py results.jsonl player_hp=10,14,18 round_scaling=0.1,0.2,0.3
+#   python sweep.py results.jsonl player_hp=8:20 price_atk=1:4 --sample 40 --buy atk,hp
+#   python sweep.py results.jsonl --summary
+
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+
+import numpy as np
+
+from batchsim import BatchSim
+from engine import Rules
+
+PARAMS = {
+    "player_hp": int,
+    "round_scaling": float,
+    "deck_size": int,
+    "card_hp": int,
+    "card_atk": int,
+    "win_rounds": int,
+    "price_atk": int,
+    "price_hp": int,
+    "price_draw": int,
+}
+
+def make_rules(params):
+    kwargs = {k: v for k, v in params.items() if not k.startswith("price_")}
+    prices = {k[len("price_"):]: v for k, v in params.items() if k.startswith("price_")}
+    return Rules(shop_prices=prices, **kwargs)
+
+def parse_spec(spec):
+    # "name=a,b,c" is a list of values, "name=lo:hi" a range (inclusive for ints)
+    name, _, values = spec.partition("=")
+    if name not in PARAMS:
+        raise SystemExit(f"unknown parameter {name!r}, expected one of {', '.join(PARAMS)}")
+    cast = PARAMS[name]
+    if ":" in values:
+        lo, hi = (cast(v) for v in values.split(":"))
+        return name, (lo, hi)
+    return name, [cast(v) for v in values.split(",")]
+
+def grid_points(specs):
+    axes = []
+    for name, values in specs:
+        if isinstance(values, tuple):
+            lo, hi = values
+            if PARAMS[name] is not int:
+                raise SystemExit(f"a grid needs explicit values for {name}, e.g. {name}={lo},{hi}")
+            values = list(range(lo, hi + 1))
+        axes.append([(name, v) for v in values])
+    return [dict(point) for point in itertools.product(*axes)]
+
+def sample_points(specs, count, seed):
+    rng = random.Random(seed)
+    points = []
+    for _ in range(count):
+        point = {}
+        for name, values in specs:
+            if isinstance(values, list):
+                point[name] = rng.choice(values)
+            elif PARAMS[name] is int:
+                point[name] = rng.randint(*values)
+            else:
+                point[name] = round(rng.uniform(*values), 4)
+        points.append(point)
+    return points
+
+def point_key(params):
+    return json.dumps(params, sort_keys=True)
+
+def chunk_seed(seed, params, chunk):
+    digest = hashlib.sha256(f"{seed}:{point_key(params)}:{chunk}".encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+# --- Worker ---
+def run_chunk(task):
+    params, chunk, games, config = task
+    max_rounds = config["max_rounds"]
+    sim = BatchSim(games, chunk_seed(config["seed"], params, chunk), max_rounds, tuple(config["buy"]),
+                   make_rules(params)).run()
+    return {
+        "config": config,
+        "params": params,
+        "chunk": chunk,
+        "games": games,
+        "wins": int(((sim.rounds >= max_rounds) | sim.won).sum()),
+        "rounds_sum": int(sim.rounds.sum()),
+        "shop_coins": sim.shop_coins.tolist(),
+        "shop_visits": sim.shop_visits.tolist(),
+    }
+
+# --- Results file ---
+def read_results(path):
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                pass  # torn last line from an interrupted run
+    return records
+
+def summarize(records):
+    points = {}
+    for r in records:
+        s = points.setdefault(point_key(r["params"]), {
+            "params": r["params"], "games": 0, "wins": 0, "rounds_sum": 0,
+            "shop_coins": np.zeros(len(r["shop_coins"])), "shop_visits": np.zeros(len(r["shop_visits"]))})
+        s["games"] += r["games"]
+        s["wins"] += r["wins"]
+        s["rounds_sum"] += r["rounds_sum"]
+        n = min(len(s["shop_coins"]), len(r["shop_coins"]))
+        s["shop_coins"][:n] += r["shop_coins"][:n]
+        s["shop_visits"][:n] += r["shop_visits"][:n]
+    summary = []
+    for s in points.values():
+        visits = s["shop_visits"]
+        curve = np.divide(s["shop_coins"], visits, out=np.zeros_like(visits), where=visits > 0)
+        last = int(np.nonzero(visits)[0].max(initial=-1)) + 1
+        summary.append({
+            "params": s["params"],
+            "games": s["games"],
+            "win_rate": s["wins"] / s["games"],
+            "mean_rounds": s["rounds_sum"] / s["games"],
+            "coin_curve": [round(c, 3) for c in curve[:last].tolist()],
+        })
+    summary.sort(key=lambda s: -s["win_rate"])
+    return summary
+
+def run_config(seed, max_rounds, buy_order, chunk_size):
+    # What a chunk's result depends on besides its parameter point
+    return {"seed": seed, "max_rounds": max_rounds, "buy": list(buy_order), "chunk_size": chunk_size}
+
+def run_sweep(path, points, games_per_point, chunk_size, seed, max_rounds, buy_order, workers=None):
+    config = run_config(seed, max_rounds, buy_order, chunk_size)
+    records = read_results(path)
+    for r in records:
+        if r.get("config") != config:
+            raise SystemExit(f"{path} was written with {r.get('config') or 'an unrecorded config'}, "
+                             f"not {config}; use another results file")
+    done = {(point_key(r["params"]), r["chunk"]) for r in records}
+    tasks = []
+    for params in points:
+        for chunk in range((games_per_point + chunk_size - 1) // chunk_size):
+            if (point_key(params), chunk) in done:
+                continue
+            games = min(chunk_size, games_per_point - chunk * chunk_size)
+            tasks.append((params, chunk, games, config))
+    if not tasks:
+        return 0
+
+    torn = False
+    if os.path.exists(path) and os.path.getsize(path):
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read() != b"\n"
+    with open(path, "a") as out:
+        if torn:
+            out.write("\n")
+        with multiprocessing.Pool(workers or os.cpu_count()) as pool:
+            for i, record in enumerate(pool.imap_unordered(run_chunk, tasks), 1):
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                print(f"\r{i}/{len(tasks)} chunks", end="", flush=True)
+    print()
+    return len(tasks)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Balance sweep for Generic Card Game")
+    parser.add_argument("results", help="JSON-lines results file, appended to and resumed from")
+    parser.add_argument("specs", nargs="*", metavar="NAME=VALUES",
+                        help="a,b,c for a list of values or lo:hi for a range; the grid is their product")
+    parser.add_argument("--sample", type=int, metavar="N", help="draw N random points instead of the full grid")
+    parser.add_argument("--summary", action="store_true", help="only summarize an existing results file")
+    parser.add_argument("--games", type=int, default=20000, help="games per parameter point")
+    parser.add_argument("--chunk", type=int, default=5000, help="games per worker task")
+    parser.add_argument("--max-rounds", type=int, default=50)
+    parser.add_argument("--buy", default="atk", help="comma separated shop buy order")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if not args.summary:
+        specs = [parse_spec(s) for s in args.specs]
+        if args.sample:
+            points = sample_points(specs, args.sample, args.seed)
+        else:
+            points = grid_points(specs)
+        ran = run_sweep(args.results, points, args.games, args.chunk, args.seed,
+                        args.max_rounds, tuple(args.buy.split(",")), args.workers)
+        print(f"ran {ran} chunks over {len(points)} parameter points")
+
+    for s in summarize(read_results(args.results)):
+        curve = " ".join(f"{c:g}" for c in s["coin_curve"][:8])
+        print(f"{point_key(s['params'])}  win {s['win_rate']:.3f}  rounds {s['mean_rounds']:.2f}  coins [{curve}]")
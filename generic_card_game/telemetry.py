@@ -0,0 +1,361 @@
+# Opt-in per-round telemetry, to find out where real players die.
+#
+# Recorder watches a live engine.Game (it wraps a few of that one object's
+# methods, like profiler.instrument) and keeps one fixed-width record per
+# round: HP at the start and end, coins, what was bought in the shop after it,
+# the enemies' total HP as set up, cards lost, draws and plays, and how the
+# round ended. Records collect in preallocated columns and every BATCH rounds
+# (and at the end of a session) a writer thread appends them to the file as
+# one block, so the frame loop only ever stores a few numbers.
+#
+# The file is append-only and columnar: a header, then blocks of
+#   "ROWS", row count, each column's values back to back (padded to 8 bytes)
+# written with a single append each, so several sessions can share a file and
+# a crash loses at most a torn last block, which the reader skips. read()
+# memory-maps the files and views the columns with NumPy, no parsing.
+#
+#   GCG_TELEMETRY=1 python genericcardgame.py          record to telemetry/
+#   python telemetry.py [FILES]                        report (default telemetry/*.gcgt)
+#   python telemetry.py --simulate 5000 --out FILE     bot sessions, and what recording costs
+
+import argparse
+import glob
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b"GCGT"
+VERSION = 1
+HEADER = struct.Struct("<4sB3x")
+BLOCK = struct.Struct("<4sI")
+BATCH = 64
+
+# Round outcomes
+SURVIVED = 0
+DIED = 1
+QUIT = 2  # the session ended during the round or in its shop
+
+COLUMNS = (
+    ("session", "<u8"),  # random per game played
+    ("round", "<u4"),  # 1 for the first round
+    ("outcome", "u1"),
+    ("hp_start", "<i4"),
+    ("hp_end", "<i4"),
+    ("coins", "<i4"),  # after the round's reward, before shopping
+    ("coins_earned", "<i4"),
+    ("shop_atk", "<u2"),
+    ("shop_hp", "<u2"),
+    ("shop_draw", "<u2"),
+    ("enemy_hp", "<i4"),  # total HP of the round's enemies when set up
+    ("cards_lost", "<u2"),
+    ("draws", "<u2"),
+    ("plays", "<u2"),
+    ("seconds", "<f4"),
+)
+DTYPES = {name: np.dtype(dtype) for name, dtype in COLUMNS}
+
+def _padded(size):
+    return (size + 7) & ~7
+
+def pack_block(columns, n):
+    out = bytearray(BLOCK.pack(b"ROWS", n))
+    for name, _ in COLUMNS:
+        data = columns[name][:n].tobytes()
+        out += data
+        out += bytes(_padded(len(data)) - len(data))
+    return bytes(out)
+
+# --- Recording ---
+class Recorder:
+    def __init__(self, path, batch=BATCH):
+        self.path = path
+        self.batch = batch
+        self.columns = self._new_columns()
+        self.n = 0
+        self.game = None
+        self.session = 0
+        self.current = None  # the round being played: [round, hp, coins, enemy hp, graveyard, draws, plays, start]
+        self.shop = None  # a survived round waiting for its purchases
+        self.rounds = 0
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def _new_columns(self):
+        return {name: np.zeros(self.batch, dtype) for name, dtype in DTYPES.items()}
+
+    def attach(self, game):
+        # Start a session on game; a game picked up mid-round (e.g. from an
+        # autosave) counts from where it is, in the shop from the next round
+        self.end_session()
+        self.game = game
+        self.session = int.from_bytes(os.urandom(8), "little")
+        for name in ("setup_enemy", "draw", "play", "start_shop", "apply_shop"):
+            setattr(game, name, getattr(self, "_" + name)(getattr(game, name)))
+        if not game.in_shop and not game.over and not game.won:
+            self._begin(sum(c.hp for c in game.enemy.in_play))
+
+    def end_session(self):
+        # Whatever round is unfinished ends as QUIT; written with the next batch
+        if self.game is None:
+            return
+        if self.shop:
+            self._store(QUIT, *self.shop, (0, 0, 0))
+        elif self.current:
+            self._store(QUIT, *self._ended(), (0, 0, 0))
+        self.current = self.shop = self.game = None
+
+    def flush(self):
+        if self.n:
+            self.jobs.put((self.columns, self.n))
+            self.columns = self._new_columns()
+            self.n = 0
+
+    def close(self):
+        self.end_session()
+        self.flush()
+        self.jobs.put(None)
+        self.thread.join()
+
+    # --- Game hooks ---
+    def _begin(self, enemy_hp):
+        game = self.game
+        player = game.player
+        self.current = [game.rounds_completed + 1, player.hp, player.coins, enemy_hp,
+                        len(player.graveyard), 0, 0, time.perf_counter()]
+
+    def _ended(self):
+        # The finished battle's fields, in column order from hp_start
+        round, hp, coins, enemy_hp, graveyard, draws, plays, start = self.current
+        player = self.game.player
+        return (round, hp, player.hp, player.coins, player.coins - coins, enemy_hp,
+                len(player.graveyard) - graveyard, draws, plays, time.perf_counter() - start)
+
+    def _setup_enemy(self, method):
+        def setup_enemy():
+            enemies = method()
+            self._begin(sum(c.hp for c in enemies))
+            return enemies
+        return setup_enemy
+
+    def _draw(self, method):
+        def draw():
+            drew = method()
+            if drew and self.current:
+                self.current[5] += 1
+                self._check_over()
+            return drew
+        return draw
+
+    def _play(self, method):
+        def play(index):
+            played = method(index)
+            if played and self.current:
+                self.current[6] += 1
+                self._check_over()
+            return played
+        return play
+
+    def _check_over(self):
+        # A won game's last round ends without a shop, so it has nothing bought
+        if self.game.over or self.game.won:
+            self._store(DIED if self.game.over else SURVIVED, *self._ended(), (0, 0, 0))
+            self.current = None
+
+    def _start_shop(self, method):
+        def start_shop():
+            method()
+            if self.current:
+                self.shop = self._ended()
+                self.current = None
+        return start_shop
+
+    def _apply_shop(self, method):
+        def apply_shop():
+            if self.shop:
+                selected = self.game.shop_selected
+                self._store(SURVIVED, *self.shop, (selected["atk"], selected["hp"], selected["draw"]))
+                self.shop = None
+            return method()
+        return apply_shop
+
+    def _store(self, outcome, round, hp_start, hp_end, coins, earned, enemy_hp, lost, draws, plays, seconds, shop):
+        i = self.n
+        c = self.columns
+        c["session"][i] = self.session
+        c["round"][i] = round
+        c["outcome"][i] = outcome
+        c["hp_start"][i] = hp_start
+        c["hp_end"][i] = hp_end
+        c["coins"][i] = coins
+        c["coins_earned"][i] = earned
+        c["shop_atk"][i], c["shop_hp"][i], c["shop_draw"][i] = shop
+        c["enemy_hp"][i] = enemy_hp
+        c["cards_lost"][i] = lost
+        c["draws"][i] = draws
+        c["plays"][i] = plays
+        c["seconds"][i] = seconds
+        self.n += 1
+        self.rounds += 1
+        if self.n == self.batch:
+            self.flush()
+
+    # --- Writer thread ---
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            try:
+                self._append(pack_block(*job))
+            except OSError as e:
+                print(f"Telemetry write failed: {e}")
+
+    def _append(self, block):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size == 0:
+                os.write(fd, HEADER.pack(MAGIC, VERSION))
+            os.write(fd, block)
+        finally:
+            os.close(fd)
+
+# --- Reading ---
+def read(paths):
+    # Every record in paths as {column: array}. Columns are views into the
+    # memory-mapped files, joined across blocks and files.
+    parts = {name: [] for name in DTYPES}
+    for path in paths:
+        if os.path.getsize(path) < HEADER.size:
+            continue
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} telemetry file")
+        offset = HEADER.size
+        while offset + BLOCK.size <= len(mm):
+            tag, n = BLOCK.unpack_from(mm, offset)
+            start = offset + BLOCK.size
+            size = sum(_padded(n * dtype.itemsize) for dtype in DTYPES.values())
+            if tag != b"ROWS" or start + size > len(mm):
+                break  # a torn last block
+            for name, dtype in DTYPES.items():
+                parts[name].append(np.frombuffer(mm, dtype, n, start))
+                start += _padded(n * dtype.itemsize)
+            offset = start
+    columns = {}
+    for name, chunks in parts.items():
+        if len(chunks) == 1:
+            columns[name] = chunks[0]
+        else:
+            columns[name] = np.concatenate(chunks) if chunks else np.empty(0, DTYPES[name])
+    return columns
+
+def summarize(columns):
+    # Per round number: how many sessions got there, died there or quit there,
+    # and the averages of what happened in it
+    rounds = columns["round"].astype(np.int64)
+    outcome = columns["outcome"]
+    size = int(rounds.max()) + 1 if len(rounds) else 1
+    reached = np.bincount(rounds, minlength=size)
+    seen = np.maximum(reached, 1)
+    shopped = np.maximum(np.bincount(rounds[outcome == SURVIVED], minlength=size), 1)
+    def mean(values, where=None, count=seen):
+        weights = values if where is None else np.where(where, values, 0)
+        return np.bincount(rounds, weights.astype(np.float64), minlength=size) / count
+    survived = outcome == SURVIVED
+    return {
+        "sessions": len(np.unique(columns["session"])),
+        "records": len(rounds),
+        "reached": reached,
+        "died": np.bincount(rounds[outcome == DIED], minlength=size),
+        "quit": np.bincount(rounds[outcome == QUIT], minlength=size),
+        "hp_lost": mean(columns["hp_start"].astype(np.int64) - columns["hp_end"]),
+        "enemy_hp": mean(columns["enemy_hp"]),
+        "cards_lost": mean(columns["cards_lost"]),
+        "moves": mean(columns["draws"].astype(np.int64) + columns["plays"]),
+        "shop_atk": mean(columns["shop_atk"], survived, shopped),
+        "shop_hp": mean(columns["shop_hp"], survived, shopped),
+        "shop_draw": mean(columns["shop_draw"], survived, shopped),
+    }
+
+def print_report(summary):
+    print(f"{summary['records']:,} rounds from {summary['sessions']:,} sessions")
+    print("round  reached   died  death%  quit  hp lost  enemy hp  cards lost  moves  atk/hp/draw bought")
+    for r in range(1, len(summary["reached"])):
+        reached = summary["reached"][r]
+        if not reached:
+            continue
+        died = summary["died"][r]
+        print(f"{r:>5}  {reached:7}  {died:5}  {died / reached:6.1%}  {summary['quit'][r]:4}  "
+              f"{summary['hp_lost'][r]:7.2f}  {summary['enemy_hp'][r]:8.1f}  {summary['cards_lost'][r]:10.2f}  "
+              f"{summary['moves'][r]:5.1f}  {summary['shop_atk'][r]:.2f}/{summary['shop_hp'][r]:.2f}/{summary['shop_draw'][r]:.2f}")
+
+# --- Simulated sessions ---
+def simulate(games, recorder=None, max_rounds=30, seed=0):
+    # overlord.py's random-move player, which dies at varied rounds; returns
+    # the rounds played
+    import random
+    from engine import ACT_DRAW, ACT_PLAY, Game, greedy_policy
+    from overlord import player_moves
+
+    rng = random.Random(seed)
+    rounds = 0
+    for _ in range(games):
+        game = Game(seed=rng.randrange(2**63))
+        if recorder:
+            recorder.attach(game)
+        while not game.over and game.rounds_completed < max_rounds and game.has_moves():
+            if game.in_shop:
+                greedy_policy(game, ("atk", "hp"))
+                continue
+            move = rng.choice(player_moves(game))
+            if move == ACT_DRAW:
+                game.draw()
+            else:
+                game.play(move - ACT_PLAY)
+        rounds += game.rounds_completed + 1
+    if recorder:
+        recorder.end_session()
+    return rounds
+
+if __name__ == "__main__":
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Report on recorded telemetry")
+    parser.add_argument("files", nargs="*", help="telemetry files (default telemetry/*.gcgt)")
+    parser.add_argument("--simulate", type=int, metavar="GAMES", help="record GAMES bot sessions first")
+    parser.add_argument("--out", default=os.path.join(BASE_DIR, "telemetry", "simulated.gcgt"),
+                        help="where --simulate records")
+    args = parser.parse_args()
+
+    if args.simulate:
+        # The same games with and without a recorder, best of two runs each;
+        # the second recording goes nowhere
+        bare = recorded = float("inf")
+        for run in range(2):
+            start = time.perf_counter()
+            rounds = simulate(args.simulate)
+            bare = min(bare, time.perf_counter() - start)
+            recorder = Recorder(args.out if run == 0 else os.devnull)
+            start = time.perf_counter()
+            simulate(args.simulate, recorder)
+            recorded = min(recorded, time.perf_counter() - start)
+            recorder.close()
+        print(f"{args.simulate:,} sessions, {rounds:,} rounds recorded to {args.out}: "
+              f"{(recorded - bare) / rounds * 1e6:+.1f} us per round (once per round, not per frame)")
+        args.files = args.files or [args.out]
+
+    paths = args.files or sorted(glob.glob(os.path.join(BASE_DIR, "telemetry", "*.gcgt")))
+    start = time.perf_counter()
+    columns = read(paths)
+    summary = summarize(columns)
+    elapsed = time.perf_counter() - start
+    print_report(summary)
+    print(f"read and aggregated {len(paths)} files in {elapsed * 1000:.1f} ms")